@@ -0,0 +1,133 @@
+"""
+断句延迟对比：固定最小静默时长 vs 自适应断句（Endpointer）
+
+用法：uv run benchmarks/endpointing.py <录音目录>
+
+录音目录下的每个 wav 文件（16kHz 单声道 16bit）包含一句话以及之后至少 1.5s 的静音。
+以整段录音中最后一帧语音作为真实的结束位置，统计两种规则判定说话结束的延迟，
+判定早于真实结束位置的记为“截断”。
+"""
+
+import sys
+import wave
+from pathlib import Path
+
+
+def init_project_context():
+    """动态导入父模块"""
+    import os
+    import sys
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+
+init_project_context()
+
+import numpy as np
+
+from config import APP_CONFIG
+from xiaozhi.services.audio.agc import AGC
+from xiaozhi.services.audio.vad.endpoint import Endpointer
+from xiaozhi.services.audio.vad.silero import Silero, SileroStream
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 512
+FRAME_DURATION = FRAME_SIZE * 1000 / SAMPLE_RATE
+
+
+def load_probs(path: Path):
+    with wave.open(str(path), "rb") as f:
+        if f.getframerate() != SAMPLE_RATE or f.getnchannels() != 1:
+            raise ValueError(f"{path.name}: 需要 16kHz 单声道音频")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+    agc = AGC(sample_rate=SAMPLE_RATE, **APP_CONFIG.get("agc", {}))
+    stream = SileroStream(Silero.model.session, SAMPLE_RATE)
+    probs = []
+    for i in range(0, len(samples) - FRAME_SIZE + 1, FRAME_SIZE):
+        probs.append(stream(agc.process(samples[i : i + FRAME_SIZE])))
+    return probs
+
+
+def measure(probs, config, adaptive_silence):
+    """返回（开始检测说话结束的帧，固定规则结束帧，自适应规则结束帧）"""
+    threshold = config["threshold"]
+    min_speech = config["min_speech_duration"] * SAMPLE_RATE / 1000
+    min_silence = config["min_silence_duration"] * SAMPLE_RATE / 1000
+    endpointer = Endpointer(
+        frame_duration=FRAME_DURATION,
+        threshold=threshold,
+        min_silence=adaptive_silence.get("min", 150),
+        base_silence=adaptive_silence.get("base", 300),
+        max_silence=adaptive_silence.get("max", 900),
+    )
+
+    # 与 VAD 一致：计数按 int16 字节数累计
+    start = fixed = adaptive = None
+    speech_count = silence_count = 0
+    for i, prob in enumerate(probs):
+        is_speech = prob >= threshold
+        endpointer.update(prob, is_speech)
+        if is_speech:
+            speech_count += FRAME_SIZE * 2
+            silence_count = 0
+        else:
+            silence_count += FRAME_SIZE * 2
+            speech_count = 0
+
+        if start is None:
+            if speech_count > min_speech:
+                start = i
+            continue
+        if fixed is None and silence_count > min_silence:
+            fixed = i
+        if adaptive is None and not is_speech and endpointer.is_endpoint():
+            adaptive = i
+    return start, fixed, adaptive
+
+
+def report(name, delays):
+    delays = np.array(delays)
+    ok = delays[delays >= 0]
+    if len(ok) == 0:
+        print(f"{name:<8} 截断: {len(delays)}/{len(delays)}")
+        return
+    print(
+        f"{name:<8} p50: {np.percentile(ok, 50):6.0f} ms"
+        f"  p95: {np.percentile(ok, 95):6.0f} ms"
+        f"  截断: {len(delays) - len(ok)}/{len(delays)}"
+    )
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+
+    config = APP_CONFIG["vad"]
+    adaptive_silence = config.get("adaptive_silence") or {}
+    fixed_delays, adaptive_delays = [], []
+    for path in sorted(Path(sys.argv[1]).glob("*.wav")):
+        probs = load_probs(path)
+        speech = [i for i, prob in enumerate(probs) if prob >= config["threshold"]]
+        start, fixed, adaptive = measure(probs, config, adaptive_silence)
+        if start is None or fixed is None or adaptive is None:
+            print(f"跳过 {path.name}：未检测到完整的一句话")
+            continue
+
+        # 最后一帧语音结束的位置
+        end = speech[-1] + 1
+        fixed_delays.append((fixed + 1 - end) * FRAME_DURATION)
+        adaptive_delays.append((adaptive + 1 - end) * FRAME_DURATION)
+
+    if not fixed_delays:
+        return 1
+    report("固定规则", fixed_delays)
+    report("自适应", adaptive_delays)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+小爱事件分发延迟对比：两个事件循环 vs 共用一个事件循环
+
+用法：uv run benchmarks/event_dispatch.py [事件数]
+
+模拟 Rust 回调线程不断触发 on_event，同时下行音频每 20ms 到达一次：
+- 两个事件循环（改动前）：事件和音频输出在小爱的后台事件循环上处理，协议在小智的事件循环上，
+  事件处理里发送 abort、下行音频交给 Rust 播放都要跨线程调度
+- 共用事件循环（改动后）：只有 Rust 回调线程到事件循环这一次跨线程调度
+
+统计从回调触发到事件协程开始执行（dispatch）、事件协程请求发送 abort 到协议协程开始执行（handoff），
+以及从回调触发到协议协程开始执行（端到端）的延迟。
+"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+
+
+def init_project_context():
+    """动态导入父模块"""
+    import os
+    import sys
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+
+init_project_context()
+
+from xiaozhi.services.audio.worker import StageStats
+from xiaozhi.utils.base import new_event_loop
+
+
+def busy(duration: float):
+    """模拟一段占用 CPU（持有 GIL）的处理"""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+class Topology:
+    def __init__(self, shared: bool):
+        self.protocol_loop = new_event_loop() if shared else asyncio.new_event_loop()
+        self.xiaoai_loop = self.protocol_loop if shared else asyncio.new_event_loop()
+        self.dispatch = StageStats()
+        self.handoff = StageStats()
+        self.end_to_end = StageStats()
+        self.running = True
+
+        for loop in {self.protocol_loop, self.xiaoai_loop}:
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.downlink(), self.protocol_loop)
+
+    @staticmethod
+    def run_on(loop, coro):
+        """和 XiaoAI.run_async 一样：已经在目标事件循环上时不再跨线程调度"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            return loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def on_event(self, sent_at: float):
+        """Rust 回调线程"""
+        asyncio.run_coroutine_threadsafe(self.dispatch_event(sent_at), self.xiaoai_loop)
+
+    async def dispatch_event(self, sent_at: float):
+        self.dispatch.add(time.perf_counter() - sent_at)
+        busy(0.0002)  # 解析事件
+        # EventManager 打断当前对话：在协议的事件循环上发送 abort
+        self.run_on(self.protocol_loop, self.send_abort(sent_at, time.perf_counter()))
+
+    async def send_abort(self, sent_at: float, requested_at: float):
+        now = time.perf_counter()
+        self.handoff.add(now - requested_at)
+        self.end_to_end.add(now - sent_at)
+
+    async def downlink(self):
+        """下行音频：协议收包解码后交给 Rust 播放"""
+        while self.running:
+            await asyncio.sleep(0.02)
+            busy(0.0005)
+            self.run_on(self.xiaoai_loop, self.output())
+
+    async def output(self):
+        busy(0.0002)
+
+    def close(self):
+        self.running = False
+        time.sleep(0.05)
+        for loop in {self.protocol_loop, self.xiaoai_loop}:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+def measure(shared: bool, count: int) -> Topology:
+    topology = Topology(shared)
+    rng = random.Random(0)
+    time.sleep(0.1)
+    for _ in range(count):
+        topology.on_event(time.perf_counter())
+        time.sleep(rng.uniform(0.005, 0.015))
+    time.sleep(0.1)
+    topology.close()
+    return topology
+
+
+def report(name: str, stats: StageStats):
+    result = stats.to_dict()
+    print(
+        f"{name:<24}{result['count']:>6}{result['avg_ms']:>10.3f}ms{result['max_ms']:>10.3f}ms"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print(f"{'拓扑':<24}{'事件':>6}{'平均':>12}{'最大':>12}")
+    for name, shared in [("两个事件循环", False), ("共用事件循环", True)]:
+        topology = measure(shared, count)
+        report(f"{name} dispatch", topology.dispatch)
+        report(f"{name} handoff", topology.handoff)
+        report(f"{name} 端到端", topology.end_to_end)
+
+
+if __name__ == "__main__":
+    main()
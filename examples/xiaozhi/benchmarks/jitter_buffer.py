@@ -0,0 +1,111 @@
+"""
+下行抖动缓冲离线测试：用合成的丢包/抖动网络模拟一段 TTS 音频的播放
+
+用法：uv run benchmarks/jitter_buffer.py [包数]
+
+服务端每 60ms 发一个包，每个包的网络延迟 = 基础延迟 + 指数分布的抖动，
+按给定概率丢包（突发丢包时连续丢若干个）。播放端按帧时长取数据，
+统计断流、补偿、FEC 恢复、迟到丢弃的次数以及播放延迟。
+"""
+
+import random
+import sys
+
+
+def init_project_context():
+    """动态导入父模块"""
+    import os
+    import sys
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+
+init_project_context()
+
+import numpy as np
+
+from config import APP_CONFIG
+from xiaozhi.services.audio.jitter import JitterBuffer
+
+FRAME_DURATION = 60
+
+# 名称: (基础延迟 ms, 平均抖动 ms, 丢包率, 突发丢包长度)
+PROFILES = {
+    "理想网络": (30, 0, 0.0, 1),
+    "轻微抖动": (30, 10, 0.0, 1),
+    "严重抖动": (50, 60, 0.0, 1),
+    "随机丢包 5%": (30, 10, 0.05, 1),
+    "突发丢包 5%": (30, 20, 0.05, 3),
+}
+
+
+def generate(count: int, base: float, jitter: float, loss: float, burst: int, seed=0):
+    """生成 (到达时间 ms, 序号) 列表，按到达时间排序"""
+    rng = random.Random(seed)
+    packets = []
+    lost = 0
+    for seq in range(count):
+        if lost == 0 and rng.random() < loss:
+            lost = burst
+        if lost:
+            lost -= 1
+            continue
+        delay = base + (rng.expovariate(1 / jitter) if jitter else 0)
+        packets.append((seq * FRAME_DURATION + delay, seq))
+    packets.sort()
+    return packets
+
+
+def simulate(packets, count: int, config: dict):
+    """按帧时长驱动播放，返回抖动缓冲的统计以及每个包的播放延迟"""
+    buffer = JitterBuffer(
+        frame_duration=FRAME_DURATION,
+        min_depth=config.get("min_depth", 2),
+        max_depth=config.get("max_depth", 8),
+        max_conceal=config.get("max_conceal", 2),
+    )
+    delays = []
+    index = 0
+    now = 0.0
+    end = count * FRAME_DURATION + 2000
+    while now < end:
+        while index < len(packets) and packets[index][0] <= now:
+            arrival, seq = packets[index]
+            buffer.put(seq.to_bytes(4, "big"), seq, arrival / 1000)
+            index += 1
+            if index == len(packets):
+                buffer.end()  # 服务端发完（tts stop）
+
+        item = buffer.pop(now / 1000)
+        if item and item[0] == "packet":
+            seq = int.from_bytes(item[1], "big")
+            delays.append(now - seq * FRAME_DURATION)
+
+        # 没在播放时每 1ms 检查一次是否可以开始，播放时每帧取一次
+        now += FRAME_DURATION if buffer.playing else 1
+    return buffer.get_metrics(), delays
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    config = APP_CONFIG.get("jitter_buffer", {})
+
+    print(
+        f"{'网络':<12}{'收到':>6}{'断流':>6}{'补偿':>6}{'FEC':>6}{'迟到':>6}"
+        f"{'目标深度':>10}{'延迟p50':>10}{'延迟p95':>10}"
+    )
+    for name, profile in PROFILES.items():
+        packets = generate(count, *profile)
+        metrics, delays = simulate(packets, count, config)
+        p50, p95 = np.percentile(delays, [50, 95]) if delays else (0, 0)
+        print(
+            f"{name:<12}{metrics['received']:>6}{metrics['underruns']:>6}"
+            f"{metrics['concealed']:>6}{metrics['recovered']:>6}{metrics['late']:>6}"
+            f"{metrics['target_depth']:>10}{p50:>9.0f}ms{p95:>8.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+上行 Opus 编码开销对比：不同帧时长/编码模式/码率/复杂度/DTX 下，编码每秒音频的 CPU 时间和码率
+
+用法：uv run benchmarks/opus_encode.py [录音文件.wav]
+
+录音文件需为 16kHz 单声道 16bit，不指定时使用合成的测试音频（说话和静音交替）。
+"""
+
+import sys
+import time
+import wave
+
+
+def init_project_context():
+    """动态导入父模块"""
+    import os
+    import sys
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+
+init_project_context()
+
+import numpy as np
+
+from xiaozhi.services.audio.codec import create_opus_encoder
+from xiaozhi.services.protocols.typing import AudioConfig
+
+SAMPLE_RATE = AudioConfig.SAMPLE_RATE
+
+# 名称: create_opus_encoder 的参数
+PROFILES = {
+    "默认 60ms": {"frame_duration": 60},
+    "默认 20ms": {"frame_duration": 20},
+    "默认 40ms": {"frame_duration": 40},
+    "voip 60ms": {"frame_duration": 60, "application": "voip"},
+    "voip 20ms 16k": {"frame_duration": 20, "application": "voip", "bitrate": 16000},
+    "voip 60ms c3": {"frame_duration": 60, "application": "voip", "complexity": 3},
+    "voip 60ms c3 dtx": {
+        "frame_duration": 60,
+        "application": "voip",
+        "complexity": 3,
+        "dtx": True,
+    },
+}
+
+
+def synthesize(seconds: float = 30) -> np.ndarray:
+    """合成测试音频：1.5s 类语音信号（调制的谐波 + 噪声）与 1s 静音交替"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    pitch = 160 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    speaking = (t % 2.5) < 1.5
+    audio = 0.2 * voice * envelope * speaking + 0.003 * rng.standard_normal(len(t))
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+
+def run(samples: np.ndarray, options: dict):
+    encoder = create_opus_encoder(**options)
+    frame_size = SAMPLE_RATE * options["frame_duration"] // 1000
+    frames = [
+        samples[i : i + frame_size].tobytes()
+        for i in range(0, len(samples) - frame_size + 1, frame_size)
+    ]
+
+    total_bytes = 0
+    start = time.process_time()
+    for frame in frames:
+        total_bytes += len(encoder.encode(frame, frame_size))
+    cpu = time.process_time() - start
+
+    duration = len(frames) * frame_size / SAMPLE_RATE
+    return cpu / duration, total_bytes * 8 / duration, len(frames) / duration
+
+
+def main():
+    samples = load_wav(sys.argv[1]) if len(sys.argv) > 1 else synthesize()
+    print(f"音频时长: {len(samples) / SAMPLE_RATE:.1f}s")
+    print(f"{'配置':<20}{'CPU(ms/s)':>12}{'码率(kbps)':>12}{'包/秒':>8}")
+    for name, options in PROFILES.items():
+        cpu, bitrate, packets = run(samples, options)
+        print(f"{name:<20}{cpu * 1000:>12.2f}{bitrate / 1000:>12.1f}{packets:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Silero VAD 单帧推理耗时对比：OnnxWrapper（逐帧分配） vs SileroStream（预分配 + IO binding）
+
+用法：uv run benchmarks/silero_vad.py
+"""
+
+import gc
+import time
+
+
+def init_project_context():
+    """动态导入父模块"""
+    import os
+    import sys
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+
+init_project_context()
+
+import numpy as np
+
+from xiaozhi.services.audio.vad.silero import OnnxWrapper, SileroStream
+from xiaozhi.utils.file import get_model_file_path
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 512
+NUM_FRAMES = 2000
+
+
+def make_frames():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 3000, FRAME_SIZE * NUM_FRAMES).astype(np.int16)
+    return [
+        samples[i : i + FRAME_SIZE].tobytes()
+        for i in range(0, len(samples), FRAME_SIZE)
+    ]
+
+
+def measure(name, vad, frames):
+    for frame in frames[:100]:
+        vad(frame)
+
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    start = time.perf_counter()
+    for frame in frames:
+        vad(frame)
+    elapsed = time.perf_counter() - start
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+
+    print(
+        f"{name:<14} {elapsed / len(frames) * 1e6:8.1f} us/frame"
+        f"  gc collections: {collections}"
+    )
+
+
+def main():
+    frames = make_frames()
+    model = OnnxWrapper(get_model_file_path("silero_vad.onnx"))
+    stream = SileroStream(model.session, SAMPLE_RATE)
+
+    def wrapper_vad(frame):
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
+        return model(samples, SAMPLE_RATE).item()
+
+    def stream_vad(frame):
+        return stream(np.frombuffer(frame, dtype=np.int16))
+
+    measure("OnnxWrapper", wrapper_vad, frames)
+    measure("SileroStream", stream_vad, frames)
+
+
+if __name__ == "__main__":
+    main()
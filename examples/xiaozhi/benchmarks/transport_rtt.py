@@ -0,0 +1,258 @@
+"""
+上行/下行音频往返延迟对比：WebSocket vs MQTT + UDP
+
+用法：uv run benchmarks/transport_rtt.py [包数] [UDP 丢包率]
+
+在本机启动三个替身服务端：
+- WebSocket 服务：回复 hello，原样返回收到的音频包
+- MQTT broker：只实现 QoS 0 的 CONNECT/SUBSCRIBE/PUBLISH/PING，收到 hello 时回复 UDP 通道参数
+- UDP 服务：原样返回收到的（加密的）音频包，可以按比例随机丢包
+
+分别用 WebsocketProtocol 和 MqttProtocol 连接，每 20ms 发送一个音频包，
+统计从 send_audio 到 on_incoming_audio 收到同一个包的往返延迟。
+MQTT 需要安装可选依赖：uv sync --extra mqtt
+"""
+
+import asyncio
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+
+def init_project_context():
+    """动态导入父模块"""
+    import os
+    import sys
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+
+init_project_context()
+
+import numpy as np
+import websockets
+
+from config import APP_CONFIG
+
+SERVER_HELLO = {
+    "type": "hello",
+    "audio_params": {"sample_rate": 24000, "frame_duration": 60},
+}
+
+# 不请求 OTA 接口，也不要把设备 ID 写回 config.py
+APP_CONFIG["xiaozhi"]["OTA_URL"] = ""
+APP_CONFIG["xiaozhi"]["DEVICE_ID"] = "02:00:00:00:00:01"
+
+from xiaozhi.services.protocols.websocket_protocol import WebsocketProtocol
+from xiaozhi.utils.config import ConfigManager
+
+
+async def websocket_server(websocket):
+    async for message in websocket:
+        if isinstance(message, str):
+            if json.loads(message).get("type") == "hello":
+                hello = {**SERVER_HELLO, "transport": "websocket"}
+                await websocket.send(json.dumps(hello))
+        else:
+            await websocket.send(message)
+
+
+class UdpEchoServer(asyncio.DatagramProtocol):
+    def __init__(self, loss: float):
+        self.loss = loss
+        self.rng = random.Random(0)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.rng.random() >= self.loss:
+            self.transport.sendto(data, addr)
+
+
+class MqttBroker:
+    """只支持 QoS 0 的最小 MQTT 3.1.1 broker"""
+
+    def __init__(self, udp_port: int):
+        self.udp_port = udp_port
+        self.subscribers: dict[str, list[asyncio.StreamWriter]] = {}
+
+    @staticmethod
+    async def read_packet(reader: asyncio.StreamReader):
+        header = (await reader.readexactly(1))[0]
+        length, shift = 0, 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return header, await reader.readexactly(length)
+
+    @staticmethod
+    def packet(header: int, body: bytes) -> bytes:
+        length, encoded = len(body), bytearray()
+        while True:
+            byte = length & 0x7F
+            length >>= 7
+            encoded.append(byte | (0x80 if length else 0))
+            if not length:
+                break
+        return bytes([header]) + bytes(encoded) + body
+
+    def publish(self, topic: str, payload: bytes):
+        body = struct.pack("!H", len(topic)) + topic.encode() + payload
+        for writer in self.subscribers.get(topic, []):
+            writer.write(self.packet(0x30, body))
+
+    def on_publish(self, topic: str, payload: bytes):
+        message = json.loads(payload)
+        if message.get("type") == "hello":
+            hello = {
+                **SERVER_HELLO,
+                "transport": "udp",
+                "session_id": "benchmark",
+                "udp": {
+                    "server": "127.0.0.1",
+                    "port": self.udp_port,
+                    "key": os.urandom(16).hex(),
+                    "nonce": "01000000" + os.urandom(4).hex() + "0000000000000000",
+                },
+            }
+            self.publish("devices/benchmark", json.dumps(hello).encode())
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                header, body = await self.read_packet(reader)
+                kind = header >> 4
+                if kind == 1:  # CONNECT
+                    writer.write(self.packet(0x20, b"\x00\x00"))
+                elif kind == 3:  # PUBLISH
+                    size = struct.unpack("!H", body[:2])[0]
+                    topic = body[2 : 2 + size].decode()
+                    offset = 2 + size + (2 if header & 0x06 else 0)
+                    self.on_publish(topic, body[offset:])
+                elif kind == 8:  # SUBSCRIBE
+                    packet_id, offset, granted = body[:2], 2, b""
+                    while offset < len(body):
+                        size = struct.unpack("!H", body[offset : offset + 2])[0]
+                        topic = body[offset + 2 : offset + 2 + size].decode()
+                        self.subscribers.setdefault(topic, []).append(writer)
+                        offset += 3 + size
+                        granted += b"\x00"
+                    writer.write(self.packet(0x90, packet_id + granted))
+                elif kind == 12:  # PINGREQ
+                    writer.write(self.packet(0xD0, b""))
+                elif kind == 14:  # DISCONNECT
+                    break
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                if writer in writers:
+                    writers.remove(writer)
+            writer.close()
+
+
+async def measure(protocol, count: int, interval: float = 0.02):
+    """每 interval 秒发送一个带编号的包，返回各个包的往返延迟（ms），丢失的包不计入"""
+    sent_at = {}
+    rtts = []
+    payload = bytes(120)  # 60ms、16kbps 左右的 Opus 包大小
+
+    def on_incoming_audio(data, seq=None):
+        index = struct.unpack("!I", data[:4])[0]
+        if index in sent_at:
+            rtts.append((time.perf_counter() - sent_at.pop(index)) * 1000)
+
+    protocol.on_incoming_audio = on_incoming_audio
+    if not await protocol.connect():
+        raise RuntimeError("连接失败")
+
+    for index in range(count):
+        sent_at[index] = time.perf_counter()
+        await protocol.send_audio([struct.pack("!I", index) + payload])
+        await asyncio.sleep(interval)
+    await asyncio.sleep(0.5)
+    return rtts
+
+
+def report(name: str, rtts: list, count: int):
+    p50, p95, p99 = np.percentile(rtts, [50, 95, 99]) if rtts else (0, 0, 0)
+    print(f"{name:<12}{len(rtts):>6}/{count:<6}{p50:>9.2f}ms{p95:>9.2f}ms{p99:>9.2f}ms")
+
+
+async def compare(count: int, loss: float = 0.0) -> dict[str, list]:
+    """启动替身服务端，依次测量 WebSocket 和 MQTT + UDP 的往返延迟（ms）"""
+    loop = asyncio.get_running_loop()
+
+    ws_server = await websockets.serve(websocket_server, "127.0.0.1", 0)
+    ws_port = ws_server.sockets[0].getsockname()[1]
+    udp_transport, _ = await loop.create_datagram_endpoint(
+        lambda: UdpEchoServer(loss), local_addr=("127.0.0.1", 0)
+    )
+    udp_port = udp_transport.get_extra_info("sockname")[1]
+    broker = MqttBroker(udp_port)
+    mqtt_server = await asyncio.start_server(broker.handle, "127.0.0.1", 0)
+    mqtt_port = mqtt_server.sockets[0].getsockname()[1]
+
+    config = ConfigManager.instance()
+    config.update_config("NETWORK.WEBSOCKET_URL", f"ws://127.0.0.1:{ws_port}")
+    config.update_config(
+        "MQTT_INFO",
+        {
+            "endpoint": f"127.0.0.1:{mqtt_port}",
+            "client_id": "benchmark",
+            "username": "benchmark",
+            "password": "benchmark",
+            "publish_topic": "device-server",
+            "subscribe_topic": "devices/benchmark",
+        },
+    )
+
+    results = {}
+    try:
+        protocol = WebsocketProtocol()
+        results["WebSocket"] = await measure(protocol, count)
+        await protocol._close_websocket()
+
+        try:
+            from xiaozhi.services.protocols.mqtt_protocol import MqttProtocol
+        except ImportError as e:
+            print(f"跳过 MQTT + UDP：{e}")
+            return results
+
+        protocol = MqttProtocol()
+        try:
+            results["MQTT + UDP"] = await measure(protocol, count)
+        finally:
+            await protocol._close_udp(notify=False)
+            protocol.mqtt_client.disconnect()
+            protocol.mqtt_client.loop_stop()
+            await asyncio.sleep(0.1)
+    finally:
+        ws_server.close()
+        mqtt_server.close()
+        udp_transport.close()
+    return results
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    loss = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+
+    results = await compare(count, loss)
+    print(f"{'协议':<12}{'收到':>13}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for name, rtts in results.items():
+        report(name, rtts, count)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -47,25 +47,88 @@ APP_CONFIG = {
         ],
         # 静音多久后自动退出唤醒（秒）
         "timeout": 20,
+        # 恢复唤醒词检测时保留的历史音频时长（ms）
+        "pre_roll": 300,
         # 语音识别结果回调
         "before_wakeup": before_wakeup,
         # 退出唤醒时的提示语（设置为空可关闭）
         "after_wakeup": after_wakeup,
     },
+    "agc": {
+        # 录音自动增益：目标音量（dBFS）
+        "target_level": -20,
+        # 最大增益（dB，小爱音箱录音音量较小，需要后期放大一下；20dB 即原来的 10 倍）
+        "max_gain": 20,
+        # 音量变大时增益下降的速度（ms）
+        "attack": 10,
+        # 音量变小时增益恢复的速度（ms）
+        "release": 500,
+    },
     "vad": {
-        # 录音音量增强倍数（小爱音箱录音音量较小，需要后期放大一下）
-        "boost": 10,
         # 语音检测阈值（0-1，越小越灵敏）
         "threshold": 0.10,
         # 最小语音时长（ms）
         "min_speech_duration": 250,
+        # 预上传模式：检测到声音后立即开始上传（含之前 1s 的音频），
+        # 说话不足最小语音时长就安静下来时，当作噪音取消本次上传
+        "speculative": False,
         # 最小静默时长（ms）
         "min_silence_duration": 500,
+        # 自适应断句：根据说话时长、语速和检测置信度动态调整结束说话所需的静默时长（ms）
+        # 例如 {"min": 150, "base": 300, "max": 900}，设置为 None 时使用上面固定的最小静默时长
+        "adaptive_silence": None,
+        # 单次语音最多缓存的时长（ms），超出后丢弃最早的部分
+        "max_speech_duration": 10000,
+        # 能量预筛选（dB）：音量高于环境噪声多少时才运行语音检测，设置为 0 关闭
+        "energy_gate": 6,
+    },
+    "opus": {
+        # 上行音频每帧时长（ms）：20/40/60，越短延迟越低，CPU 和带宽开销越大
+        "frame_duration": 60,
+        # 编码模式：voip（针对人声优化）或 audio
+        "application": "audio",
+        # 码率（bps），为 None 时使用 Opus 的默认值
+        "bitrate": None,
+        # 编码复杂度（0-10），越低越省 CPU，为 None 时使用 Opus 的默认值
+        "complexity": None,
+        # 不连续传输：静音时只发送很小的包，节省带宽
+        "dtx": False,
+    },
+    "connection": {
+        # 空闲时验证连接（发送心跳）的间隔（s）
+        "check_interval": 1,
+        # 重连失败后的退避时间（s）：从 backoff_base 开始翻倍，最多 backoff_max，并加入随机抖动
+        "backoff_base": 0.5,
+        "backoff_max": 30,
+    },
+    "uplink": {
+        # 待发送的录音帧最多缓存的个数，超出时丢弃最旧的帧
+        "max_queue": 50,
+        # 发送缓冲区积压超过多少字节时认为网络拥塞
+        "high_water": 16384,
+        # 网络拥塞时最多保留的待发送帧数（丢弃更早的帧，避免延迟越积越大）
+        "congested_queue": 5,
+        # 说话过程中断线时，重连后最多补发多久之前的录音（ms）
+        "replay_max_age": 5000,
+    },
+    "playback": {
+        # 音箱播放的采样率（Hz）。Opus 不支持的采样率（比如 44100）会先按 48k 解码再重采样
+        "sample_rate": 24000,
+    },
+    "jitter_buffer": {
+        # 开始播放前缓冲的最少/最多帧数（会根据网络抖动在两者之间自动调整）
+        "min_depth": 2,
+        "max_depth": 8,
+        # 断流时最多用丢包补偿填充的帧数，之后停止播放、重新缓冲
+        "max_conceal": 2,
+        # 播放时最多领先实时的时长（ms），留给音箱那一端的网络抖动
+        "lead": 120,
     },
     "xiaozhi": {
         "OTA_URL": "https://api.tenclass.net/xiaozhi/ota/",
         "WEBSOCKET_URL": "wss://api.tenclass.net/xiaozhi/v1/",
         "WEBSOCKET_ACCESS_TOKEN": "", #（可选）一般用不到这个值
+        "PROTOCOL": "websocket", # 通信协议：websocket 或 mqtt（MQTT + UDP，需要安装可选依赖：uv sync --extra mqtt）
         "DEVICE_ID": "", #（可选）默认自动生成
         "VERIFICATION_CODE": "", # 首次登陆时，验证码会在这里更新
     },
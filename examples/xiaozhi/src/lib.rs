@@ -3,7 +3,8 @@ use open_xiaoai::services::connect::rpc::RPC;
 use pyo3::prelude::*;
 use pyo3::types::PyBytes;
 use serde_json::json;
-use server::AppServer;
+use server::{play_config, AppServer, OUTPUT_SAMPLE_RATE};
+use std::sync::atomic::Ordering;
 
 pub mod macros;
 pub mod python;
@@ -20,6 +21,22 @@ fn on_output_data(py: Python, data: Py<PyBytes>) -> PyResult<Bound<PyAny>> {
     })
 }
 
+#[pyfunction]
+fn set_output_sample_rate(sample_rate: u32) {
+    OUTPUT_SAMPLE_RATE.store(sample_rate, Ordering::Relaxed);
+}
+
+#[pyfunction]
+fn flush_output(py: Python) -> PyResult<Bound<PyAny>> {
+    // 重新开始播放：客户端会先结束当前的 aplay 进程，丢弃已经缓冲还没播放的音频
+    pyo3_async_runtimes::tokio::future_into_py(py, async move {
+        let _ = RPC::instance()
+            .call_remote("start_play", Some(json!(play_config())), None)
+            .await;
+        Ok(())
+    })
+}
+
 #[pyfunction]
 fn start_server(py: Python) -> PyResult<Bound<PyAny>> {
     pyo3_async_runtimes::tokio::future_into_py(py, async {
@@ -50,6 +67,8 @@ fn run_shell(py: Python, script: String, timeout_millis: f64) -> PyResult<Bound<
 fn open_xiaoai_server(_py: Python, m: Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(start_server, &m)?)?;
     m.add_function(wrap_pyfunction!(on_output_data, &m)?)?;
+    m.add_function(wrap_pyfunction!(flush_output, &m)?)?;
+    m.add_function(wrap_pyfunction!(set_output_sample_rate, &m)?)?;
     m.add_function(wrap_pyfunction!(run_shell, &m)?)?;
     crate::python::init_module(&m)?;
     Ok(())
@@ -11,11 +11,29 @@ use pyo3::types::PyBytes;
 use pyo3::types::PyString;
 use pyo3::Python;
 use serde_json::json;
+use std::sync::atomic::{AtomicU32, Ordering};
 use tokio::net::{TcpListener, TcpStream};
 use tokio_tungstenite::accept_async;
 
 pub struct AppServer;
 
+/// 音箱播放的采样率（由 Python 端按配置设置）
+pub static OUTPUT_SAMPLE_RATE: AtomicU32 = AtomicU32::new(24000);
+
+/// 播放配置：缓冲 60ms 的音频
+pub fn play_config() -> AudioConfig {
+    let sample_rate = OUTPUT_SAMPLE_RATE.load(Ordering::Relaxed);
+    let buffer_size = sample_rate * 60 / 1000;
+    AudioConfig {
+        pcm: "noop".into(),
+        channels: 1,
+        bits_per_sample: 16,
+        sample_rate,
+        period_size: buffer_size / 4,
+        buffer_size,
+    }
+}
+
 async fn test() -> Result<(), AppError> {
     SpeakerManager::play_text("已连接").await?;
 
@@ -35,18 +53,7 @@ async fn test() -> Result<(), AppError> {
         .await;
 
     let _ = RPC::instance()
-        .call_remote(
-            "start_play",
-            Some(json!(AudioConfig {
-                pcm: "noop".into(),
-                channels: 1,
-                bits_per_sample: 16,
-                sample_rate: 24000,
-                period_size: 1440 / 4,
-                buffer_size: 1440,
-            })),
-            None,
-        )
+        .call_remote("start_play", Some(json!(play_config())), None)
         .await;
 
     Ok(())
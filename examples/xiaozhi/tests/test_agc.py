@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from xiaozhi.services.audio.agc import AGC
+
+CHUNK = 320  # 20ms
+
+
+def tone(amplitude: float, n: int = CHUNK) -> np.ndarray:
+    t = np.arange(n) / 16000
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    x = samples.astype(np.float64)
+    return 20 * np.log10(np.sqrt(np.mean(x * x)) / 32768)
+
+
+class AGCTest(unittest.TestCase):
+    def test_default_matches_old_fixed_boost(self):
+        agc = AGC()
+        self.assertAlmostEqual(agc.max_gain, 10)
+        self.assertAlmostEqual(agc.gain_db, 20)
+
+    def test_quiet_input_never_exceeds_max_gain(self):
+        agc = AGC(max_gain=20)
+        quiet = tone(30)
+        for _ in range(50):
+            out = agc.process(quiet)
+        self.assertLessEqual(agc.gain, agc.max_gain + 1e-6)
+        self.assertAlmostEqual(agc.gain_db, 20, places=3)
+        np.testing.assert_allclose(out, quiet.astype(np.float32) * 10, atol=1)
+
+    def test_loud_input_converges_to_target_level(self):
+        agc = AGC(target_level=-20)
+        loud = tone(3000)
+        for _ in range(50):
+            out = agc.process(loud)
+        self.assertAlmostEqual(rms_dbfs(out), -20, delta=0.5)
+        self.assertEqual(agc.limited_samples, 0)
+
+    def test_limiter_prevents_clipping_and_is_counted(self):
+        agc = AGC(target_level=-3)
+        # 峰值 20000，默认增益 10 倍会溢出
+        loud = tone(20000)
+        out = agc.process(loud)
+        limit = 32767 / np.max(np.abs(loud))
+        self.assertEqual(agc.limited_samples, CHUNK)
+        self.assertAlmostEqual(agc.gain, limit, places=4)
+        # 整段按峰值允许的增益线性放大，没有被削顶
+        np.testing.assert_allclose(out, loud.astype(np.float32) * limit, atol=1)
+
+    def test_attack_is_faster_than_release(self):
+        agc = AGC(target_level=-20)
+        for _ in range(50):
+            agc.process(tone(3000))
+        settled = agc.gain
+
+        agc.process(tone(30000))
+        dropped = settled - agc.gain
+        agc.process(tone(3000))
+        recovered = agc.gain
+        agc.process(tone(3000))
+        self.assertGreater(dropped, 0)
+        self.assertLess(agc.gain - recovered, dropped)
+
+    def test_empty_input(self):
+        agc = AGC()
+        empty = np.array([], dtype=np.int16)
+        self.assertEqual(len(agc.process(empty)), 0)
+        self.assertEqual(agc.gain_db, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from xiaozhi.services.audio.worker import CodecWorker
+
+
+class CodecWorkerTest(unittest.TestCase):
+    def test_jobs_run_off_thread_in_order(self):
+        worker = CodecWorker(max_pending=10)
+        results = []
+
+        def job(i):
+            results.append((i, threading.current_thread().name))
+            return i
+
+        # 提交时不等待，结果按提交顺序完成
+        futures = [worker.submit("encode", job, i) for i in range(10)]
+        self.assertEqual(
+            [future.result(timeout=1) for future in futures], list(range(10))
+        )
+
+        self.assertEqual([i for i, _ in results], list(range(10)))
+        self.assertTrue(all(name == "codec-0" for _, name in results))
+        self.assertEqual(worker.get_metrics()["encode"]["count"], 10)
+
+    def test_full_queue_drops_new_jobs(self):
+        worker = CodecWorker(max_pending=2)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(1)
+
+        first = worker.submit("decode", block)
+        self.assertTrue(started.wait(1))
+        # 工作线程被占用，队列里最多再放 2 个任务
+        queued = [worker.submit("decode", lambda: None) for _ in range(3)]
+        release.set()
+
+        self.assertIsNone(queued[2])
+        self.assertEqual(worker.dropped, 1)
+        first.result(timeout=1)
+        for future in queued[:2]:
+            future.result(timeout=1)
+        self.assertEqual(worker.get_metrics()["decode"]["count"], 3)
+
+    def test_exception_is_delivered_to_future(self):
+        worker = CodecWorker()
+        future = worker.submit("encode", lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
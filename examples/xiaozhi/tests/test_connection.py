@@ -0,0 +1,141 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from config import APP_CONFIG
+
+# 不请求 OTA 接口，也不要把设备 ID 写回 config.py
+APP_CONFIG["xiaozhi"]["OTA_URL"] = ""
+APP_CONFIG["xiaozhi"]["DEVICE_ID"] = "02:00:00:00:00:01"
+
+from xiaozhi.ref import set_xiaozhi
+from xiaozhi.services.protocols.connection import ConnectionManager
+from xiaozhi.services.protocols.typing import DeviceState
+from xiaozhi.services.protocols.websocket_protocol import WebsocketProtocol
+
+
+class FakeProtocol:
+    def __init__(self, reachable: bool, delay: float = 0):
+        self.reachable = reachable
+        self.delay = delay
+        self.opened = False
+        self.attempts = 0
+        self.on_network_error = None
+
+    def is_audio_channel_opened(self) -> bool:
+        return self.opened
+
+    async def validate(self) -> bool:
+        return self.opened
+
+    async def connect(self) -> bool:
+        self.attempts += 1
+        reachable = self.reachable
+        await asyncio.sleep(self.delay)
+        if not reachable:
+            self.on_network_error("无法连接服务: refused")
+            return False
+        self.opened = True
+        return True
+
+
+class ConnectionManagerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.xiaozhi = SimpleNamespace(device_state=DeviceState.LISTENING)
+        set_xiaozhi(self.xiaozhi)
+        self.config = dict(APP_CONFIG.get("connection", {}))
+        APP_CONFIG["connection"] = {
+            "check_interval": 0.01,
+            "backoff_base": 0.01,
+            "backoff_max": 0.02,
+        }
+
+    def tearDown(self):
+        APP_CONFIG["connection"] = self.config
+
+    async def test_failed_reconnect_keeps_device_state(self):
+        errors = []
+        protocol = FakeProtocol(reachable=False)
+        protocol.on_network_error = errors.append
+        connection = ConnectionManager(protocol)
+        await connection.start()
+
+        self.assertFalse(await connection.ensure_connected(timeout=0.1))
+        connection.task.cancel()
+
+        # 后台重连失败不会通知应用，也不会把正在录音的设备切回 IDLE
+        self.assertGreater(protocol.attempts, 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.xiaozhi.device_state, DeviceState.LISTENING)
+        self.assertEqual(connection.failures, protocol.attempts)
+        self.assertIn("refused", connection.get_metrics()["last_error"])
+
+    async def test_ensure_connected_waits_for_reconnect(self):
+        protocol = FakeProtocol(reachable=True)
+        connection = ConnectionManager(protocol)
+        await connection.start()
+        self.assertTrue(await connection.ensure_connected(timeout=1))
+
+        # 断线后不会因为之前的连接成功而立即返回
+        protocol.opened = False
+        self.assertTrue(await connection.ensure_connected(timeout=1))
+        connection.task.cancel()
+        self.assertEqual(protocol.attempts, 2)
+        self.assertIsNone(connection.last_error)
+
+    async def test_warm_up_during_connect_is_not_lost(self):
+        APP_CONFIG["connection"] = {"check_interval": 10, "backoff_base": 10}
+        protocol = FakeProtocol(reachable=False, delay=0.05)
+        connection = ConnectionManager(protocol)
+        await connection.start()
+        await asyncio.sleep(0.01)
+
+        # 第一次重连还没失败时服务已经恢复，不需要等 10 秒的退避
+        protocol.reachable = True
+        self.assertTrue(await connection.ensure_connected(timeout=1))
+        connection.task.cancel()
+        self.assertEqual(protocol.attempts, 2)
+
+    async def test_unexpected_error_backs_off(self):
+        APP_CONFIG["connection"] = {"check_interval": 0, "backoff_base": 0.05}
+        protocol = FakeProtocol(reachable=True)
+
+        async def connect():
+            protocol.attempts += 1
+            raise RuntimeError("boom")
+
+        protocol.connect = connect
+        connection = ConnectionManager(protocol)
+        await connection.start()
+        await asyncio.sleep(0.2)
+        connection.task.cancel()
+
+        self.assertLessEqual(protocol.attempts, 5)
+        self.assertEqual(connection.failures, protocol.attempts)
+        self.assertIn("boom", connection.last_error)
+
+
+class StaleWebsocket:
+    def __init__(self):
+        self.transport = SimpleNamespace(aborted=False)
+        self.transport.abort = lambda: setattr(self.transport, "aborted", True)
+
+    async def send(self, message):
+        raise ConnectionError("broken pipe")
+
+
+class WebsocketValidateTest(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_validate_drops_stale_socket(self):
+        protocol = WebsocketProtocol()
+        websocket = StaleWebsocket()
+        protocol.websocket = websocket
+        protocol.connected = True
+
+        self.assertFalse(await protocol.validate())
+        self.assertTrue(websocket.transport.aborted)
+        self.assertIsNone(protocol.websocket)
+        self.assertFalse(protocol.is_audio_channel_opened())
+
+
+if __name__ == "__main__":
+    unittest.main()
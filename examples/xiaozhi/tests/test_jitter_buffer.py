@@ -0,0 +1,160 @@
+import unittest
+
+from xiaozhi.services.audio.jitter import JitterBuffer
+
+FRAME = 60
+
+
+def feed(buffer: JitterBuffer, seqs, start: float = 0.0, spacing: float = FRAME):
+    """按固定间隔（ms）送入一串包，返回最后一个包的到达时间"""
+    arrival = start
+    for seq in seqs:
+        buffer.put(bytes([seq % 256]), seq, arrival)
+        arrival += spacing / 1000
+    return arrival - spacing / 1000
+
+
+class TargetDepthTest(unittest.TestCase):
+    def test_steady_stream_keeps_min_depth(self):
+        buffer = JitterBuffer(frame_duration=FRAME)
+        feed(buffer, range(50))
+        self.assertEqual(buffer.target_depth, buffer.min_depth)
+        self.assertLess(buffer.jitter, 1)
+
+    def test_late_arrivals_deepen_up_to_max(self):
+        buffer = JitterBuffer(frame_duration=FRAME, max_depth=6)
+        arrival = 0.0
+        for seq in range(200):
+            # 每隔一个包晚到 300ms
+            late = 0.3 if seq % 2 else 0.0
+            buffer.put(b"x", seq, arrival + late)
+            arrival += FRAME / 1000
+        self.assertGreater(buffer.target_depth, buffer.min_depth)
+        self.assertLessEqual(buffer.target_depth, buffer.max_depth)
+
+    def test_silence_between_sentences_is_not_jitter(self):
+        buffer = JitterBuffer(frame_duration=FRAME)
+        last = feed(buffer, range(20))
+        # 两句话之间 3 秒没有数据，序号连续
+        feed(buffer, range(20, 40), start=last + 3)
+        self.assertLess(buffer.jitter, 1)
+        self.assertEqual(buffer.target_depth, buffer.min_depth)
+
+    def test_early_burst_is_not_jitter(self):
+        buffer = JitterBuffer(frame_duration=FRAME)
+        # 服务端一次性推送 20 个包
+        feed(buffer, range(20), spacing=5)
+        self.assertEqual(buffer.target_depth, buffer.min_depth)
+
+
+class PlayoutTest(unittest.TestCase):
+    def setUp(self):
+        self.buffer = JitterBuffer(frame_duration=FRAME, min_depth=2, max_conceal=2)
+
+    def test_waits_for_target_depth(self):
+        self.buffer.put(b"a", 0, 0.0)
+        self.assertIsNone(self.buffer.pop(0.0))
+        self.buffer.put(b"b", 1, 0.06)
+        self.assertEqual(self.buffer.pop(0.06), ("packet", b"a"))
+        self.assertEqual(self.buffer.pop(0.06), ("packet", b"b"))
+
+    def test_reorders_by_sequence(self):
+        self.buffer.put(b"b", 1, 0.0)
+        self.buffer.put(b"a", 0, 0.01)
+        self.assertEqual(self.buffer.pop(), ("packet", b"a"))
+        self.assertEqual(self.buffer.pop(), ("packet", b"b"))
+
+    def test_single_loss_uses_fec_of_next_packet(self):
+        for seq in [0, 1, 3]:
+            self.buffer.put(bytes([seq]), seq, seq * 0.06)
+        self.assertEqual(self.buffer.pop(), ("packet", b"\x00"))
+        self.assertEqual(self.buffer.pop(), ("packet", b"\x01"))
+        self.assertEqual(self.buffer.pop(), ("fec", b"\x03"))
+        self.assertEqual(self.buffer.pop(), ("packet", b"\x03"))
+        self.assertEqual(self.buffer.recovered, 1)
+
+    def test_burst_loss_conceals_then_recovers(self):
+        for seq in [0, 1, 4]:
+            self.buffer.put(bytes([seq]), seq, seq * 0.06)
+        kinds = [self.buffer.pop()[0] for _ in range(5)]
+        self.assertEqual(kinds, ["packet", "packet", "plc", "fec", "packet"])
+        self.assertEqual(self.buffer.concealed, 1)
+
+    def test_underrun_conceals_then_rebuffers(self):
+        feed(self.buffer, range(2))
+        self.buffer.pop()
+        self.buffer.pop()
+        self.assertEqual(self.buffer.pop(), ("plc", None))
+        self.assertEqual(self.buffer.pop(), ("plc", None))
+        self.assertIsNone(self.buffer.pop())
+        self.assertEqual(self.buffer.underruns, 1)
+        self.assertFalse(self.buffer.playing)
+
+    def test_packet_after_underrun_skips_concealed_frames(self):
+        feed(self.buffer, range(3))
+        for _ in range(3):
+            self.buffer.pop()
+        # 3、4 号包丢了（已经补偿过），5 号包到达时直接接着播放
+        self.assertEqual(self.buffer.pop(), ("plc", None))
+        self.assertEqual(self.buffer.pop(), ("plc", None))
+        self.buffer.put(b"\x05", 5, 0.3)
+        self.assertEqual(self.buffer.pop(), ("packet", b"\x05"))
+
+    def test_late_and_duplicate_packets_are_dropped(self):
+        feed(self.buffer, range(3))
+        self.buffer.pop()
+        self.buffer.put(b"\x00", 0, 0.2)
+        self.buffer.put(b"\x02", 2, 0.2)
+        self.assertEqual(self.buffer.late, 2)
+
+    def test_short_tail_is_played_after_idle_timeout(self):
+        self.buffer.put(b"a", 0, 0.0)
+        # 凑不够目标深度，但已经一段时间没有新包了
+        self.assertIsNone(self.buffer.pop(0.06))
+        self.assertEqual(self.buffer.pop(0.12), ("packet", b"a"))
+
+    def test_end_of_stream_plays_tail_without_plc(self):
+        feed(self.buffer, range(3))
+        for _ in range(2):
+            self.buffer.pop()
+        self.buffer.end()
+        self.assertEqual(self.buffer.pop(), ("packet", b"\x02"))
+        self.assertIsNone(self.buffer.pop())
+        self.assertEqual(self.buffer.underruns, 0)
+        self.assertEqual(self.buffer.concealed, 0)
+        self.assertFalse(self.buffer.playing)
+
+    def test_end_drains_tail_while_rebuffering(self):
+        self.buffer.put(b"a", 0, 0.0)
+        self.buffer.end()
+        self.assertEqual(self.buffer.pop(0.0), ("packet", b"a"))
+        self.assertIsNone(self.buffer.pop(0.0))
+        self.assertEqual(self.buffer.concealed, 0)
+
+    def test_next_stream_after_end_buffers_again(self):
+        self.buffer.put(b"a", 0, 0.0)
+        self.buffer.end()
+        self.buffer.pop(0.0)
+        self.buffer.pop(0.0)
+        self.buffer.put(b"b", 1, 5.0)
+        self.assertFalse(self.buffer.ended)
+        self.assertIsNone(self.buffer.pop(5.0))
+
+    def test_get_returns_ended_tail(self):
+        self.buffer.put(b"a", 0)
+        self.buffer.end()
+        self.assertEqual(self.buffer.get(timeout=0.1), ("packet", b"a"))
+
+    def test_reset_starts_a_new_session(self):
+        feed(self.buffer, range(3))
+        self.buffer.pop()
+        self.buffer.reset()
+        self.assertEqual(self.buffer.depth, 0)
+        self.assertIsNone(self.buffer.pop())
+        self.buffer.put(b"a", 0, 1.0)
+        self.buffer.put(b"b", 1, 1.06)
+        self.assertEqual(self.buffer.pop(), ("packet", b"a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
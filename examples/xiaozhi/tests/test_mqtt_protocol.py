@@ -0,0 +1,143 @@
+import asyncio
+import os
+import unittest
+
+from config import APP_CONFIG
+
+# 不请求 OTA 接口，也不要把设备 ID 写回 config.py
+APP_CONFIG["xiaozhi"]["OTA_URL"] = ""
+APP_CONFIG["xiaozhi"]["DEVICE_ID"] = "02:00:00:00:00:01"
+
+from xiaozhi.services.protocols.mqtt_protocol import MqttProtocol
+
+NONCE = bytes.fromhex("01000000" + "a1b2c3d4" + "0000000000000000")
+
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    def sendto(self, data):
+        self.sent.append(data)
+
+    def close(self):
+        self.closed = True
+
+    def get_write_buffer_size(self):
+        return 0
+
+
+def server_hello(**overrides):
+    hello = {
+        "type": "hello",
+        "transport": "udp",
+        "session_id": "session-1",
+        "udp": {
+            "server": "127.0.0.1",
+            "port": 8884,
+            "key": os.urandom(16).hex(),
+            "nonce": NONCE.hex(),
+        },
+        "audio_params": {"sample_rate": 16000, "frame_duration": 20},
+    }
+    hello.update(overrides)
+    return hello
+
+
+class MqttProtocolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.protocol = MqttProtocol()
+        self.protocol.loop = asyncio.get_running_loop()
+        self.protocol.hello_received = asyncio.Event()
+        self.transport = FakeTransport()
+
+        self.json_messages = []
+        self.audio = []
+        self.closed = 0
+
+        async def on_closed():
+            self.closed += 1
+
+        self.protocol.on_incoming_json = self.json_messages.append
+        self.protocol.on_incoming_audio = lambda data, seq: self.audio.append(
+            (data, seq)
+        )
+        self.protocol.on_audio_channel_closed = on_closed
+
+    def open_channel(self):
+        self.protocol._handle_json(server_hello())
+        self.protocol.udp_transport = self.transport
+        self.protocol.connected = True
+
+    async def test_server_hello_sets_udp_channel(self):
+        hello = server_hello()
+        self.protocol._handle_json(hello)
+        self.assertTrue(self.protocol.hello_received.is_set())
+        self.assertEqual(self.protocol.session_id, "session-1")
+        self.assertEqual(self.protocol.udp_server, "127.0.0.1")
+        self.assertEqual(self.protocol.udp_port, 8884)
+        self.assertEqual(self.protocol.udp_key.hex(), hello["udp"]["key"])
+        self.assertEqual(self.protocol.udp_nonce, NONCE)
+        self.assertEqual(self.protocol.server_sample_rate, 16000)
+        self.assertEqual(self.protocol.server_frame_size, 320)
+
+    async def test_hello_for_other_transport_is_ignored(self):
+        self.protocol._handle_json(server_hello(transport="websocket"))
+        self.assertFalse(self.protocol.hello_received.is_set())
+        self.assertEqual(self.json_messages, [])
+
+    async def test_other_messages_are_forwarded(self):
+        message = {"type": "tts", "state": "start"}
+        self.protocol._handle_json(message)
+        self.assertEqual(self.json_messages, [message])
+
+    async def test_uplink_nonce_layout(self):
+        self.open_channel()
+        await self.protocol.send_audio_frame(b"hello")
+        await self.protocol.send_audio_frame(b"opus!!")
+
+        first, second = self.transport.sent
+        # [0:2] 类型，[2:4] 载荷长度，[4:12] 会话标识，[12:16] 序号（均为大端）
+        self.assertEqual(first[:2], NONCE[:2])
+        self.assertEqual(int.from_bytes(first[2:4], "big"), 5)
+        self.assertEqual(first[4:12], NONCE[4:12])
+        self.assertEqual(int.from_bytes(first[12:16], "big"), 1)
+        self.assertEqual(int.from_bytes(second[2:4], "big"), 6)
+        self.assertEqual(int.from_bytes(second[12:16], "big"), 2)
+
+        # 载荷是用包头作为 nonce 的 AES-CTR 密文
+        self.assertNotEqual(first[16:], b"hello")
+        self.assertEqual(self.protocol._crypt(first[:16], first[16:]), b"hello")
+
+    async def test_downlink_packet_is_decrypted_with_sequence(self):
+        self.open_channel()
+        nonce = (
+            NONCE[:2] + (4).to_bytes(2, "big") + NONCE[4:12] + (7).to_bytes(4, "big")
+        )
+        self.protocol._on_udp_packet(nonce + self.protocol._crypt(nonce, b"opus"))
+        self.assertEqual(self.audio, [(b"opus", 7)])
+
+    async def test_short_packet_is_ignored(self):
+        self.open_channel()
+        self.protocol._on_udp_packet(NONCE)
+        self.assertEqual(self.audio, [])
+
+    async def test_goodbye_closes_audio_channel(self):
+        self.open_channel()
+        self.protocol._handle_json({"type": "goodbye", "session_id": "session-1"})
+        await asyncio.sleep(0)
+        self.assertFalse(self.protocol.is_audio_channel_opened())
+        self.assertTrue(self.transport.closed)
+        self.assertEqual(self.closed, 1)
+
+    async def test_goodbye_for_other_session_is_ignored(self):
+        self.open_channel()
+        self.protocol._handle_json({"type": "goodbye", "session_id": "other"})
+        await asyncio.sleep(0)
+        self.assertTrue(self.protocol.is_audio_channel_opened())
+        self.assertEqual(self.closed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from xiaozhi.services.audio.resample import Resampler
+
+
+def tone(freq: float, rate: int, seconds: float = 0.5, amplitude: float = 10000):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def rms(samples: np.ndarray) -> float:
+    x = samples.astype(np.float64)
+    return float(np.sqrt(np.mean(x * x)))
+
+
+class ResamplerTest(unittest.TestCase):
+    def test_chunked_output_matches_whole_input(self):
+        samples = tone(440, 24000)
+        whole = Resampler(24000, 44100).process(samples)
+
+        resampler = Resampler(24000, 44100)
+        # 不规则的分段（包括空段和 1 个采样的段）
+        bounds = [0, 1, 1, 480, 1237, 1440, 7000, len(samples)]
+        chunks = [
+            resampler.process(samples[start:end])
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        np.testing.assert_array_equal(np.concatenate(chunks), whole)
+
+    def test_output_length_follows_rate_ratio(self):
+        resampler = Resampler(24000, 44100)
+        self.assertEqual((resampler.up, resampler.down), (147, 80))
+        total = sum(len(resampler.process(np.zeros(480, np.int16))) for _ in range(50))
+        # 1 秒的输入正好得到 1 秒的输出
+        self.assertEqual(total, 44100)
+
+    def test_same_rate_is_passthrough(self):
+        samples = tone(440, 16000)
+        self.assertIs(Resampler(16000, 16000).process(samples), samples)
+
+    def test_passband_tone_keeps_level(self):
+        out = Resampler(24000, 48000).process(tone(1000, 24000))
+        # 跳过滤波器的起始过渡段
+        self.assertAlmostEqual(rms(out[100:]) / rms(tone(1000, 48000)), 1, delta=0.02)
+
+    def test_downsampling_rejects_aliases(self):
+        # 12kHz 超过 16kHz 输出的奈奎斯特频率，需要被低通滤掉
+        out = Resampler(48000, 16000).process(tone(12000, 48000))
+        self.assertLess(rms(out[100:]), rms(tone(12000, 48000)) * 0.05)
+
+    def test_reset_clears_history(self):
+        resampler = Resampler(24000, 48000)
+        first = resampler.process(tone(440, 24000, 0.1))
+        resampler.process(tone(880, 24000, 0.1))
+        resampler.reset()
+        np.testing.assert_array_equal(resampler.process(tone(440, 24000, 0.1)), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
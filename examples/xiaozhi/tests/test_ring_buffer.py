@@ -0,0 +1,117 @@
+import threading
+import unittest
+
+import numpy as np
+
+from xiaozhi.services.audio.ring_buffer import BroadcastRingBuffer, RingBuffer
+
+
+def samples(start: int, stop: int) -> np.ndarray:
+    return np.arange(start, stop, dtype=np.int16)
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_read_in_order_across_wrap(self):
+        ring = RingBuffer(8)
+        ring.write(samples(0, 6))
+        np.testing.assert_array_equal(ring.read(4), samples(0, 4))
+        ring.write(samples(6, 12))
+        self.assertEqual(len(ring), 8)
+        np.testing.assert_array_equal(ring.read(), samples(4, 12))
+        self.assertEqual(ring.dropped, 0)
+
+    def test_short_read_consumes_nothing(self):
+        ring = RingBuffer(8)
+        ring.write(samples(0, 3))
+        self.assertIsNone(ring.read(4))
+        np.testing.assert_array_equal(ring.peek(2), samples(0, 2))
+        np.testing.assert_array_equal(ring.read(3), samples(0, 3))
+
+    def test_overflow_drops_oldest(self):
+        ring = RingBuffer(8)
+        ring.write(samples(0, 6))
+        ring.write(samples(6, 10))
+        self.assertEqual(ring.dropped, 2)
+        np.testing.assert_array_equal(ring.read(), samples(2, 10))
+
+    def test_write_larger_than_capacity_keeps_latest(self):
+        ring = RingBuffer(8)
+        ring.write(samples(0, 3))
+        ring.write(samples(3, 15))
+        self.assertEqual(ring.dropped, 7)
+        np.testing.assert_array_equal(ring.read(), samples(7, 15))
+
+    def test_clear(self):
+        ring = RingBuffer(8)
+        ring.write(samples(0, 5))
+        ring.clear()
+        self.assertEqual(len(ring), 0)
+        self.assertIsNone(ring.read(1))
+
+    def test_capacity_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+
+class BroadcastRingBufferTest(unittest.TestCase):
+    def test_readers_have_independent_cursors(self):
+        ring = BroadcastRingBuffer(16)
+        a = ring.create_reader()
+        b = ring.create_reader()
+        ring.write(samples(0, 6))
+
+        np.testing.assert_array_equal(a.read(4), samples(0, 4))
+        np.testing.assert_array_equal(b.read(), samples(0, 6))
+        self.assertEqual(len(a), 2)
+        self.assertEqual(len(b), 0)
+
+    def test_reader_only_sees_data_written_after_creation(self):
+        ring = BroadcastRingBuffer(16)
+        ring.write(samples(0, 4))
+        reader = ring.create_reader()
+        ring.write(samples(4, 6))
+        np.testing.assert_array_equal(reader.read(), samples(4, 6))
+
+    def test_slow_reader_skips_overwritten_data(self):
+        ring = BroadcastRingBuffer(8)
+        slow = ring.create_reader()
+        fast = ring.create_reader()
+        for start in range(0, 12, 3):
+            ring.write(samples(start, start + 3))
+            fast.read()
+
+        self.assertEqual(len(slow), 8)
+        np.testing.assert_array_equal(slow.read(), samples(4, 12))
+        self.assertEqual(slow.dropped, 4)
+        self.assertEqual(fast.dropped, 0)
+
+    def test_read_into_without_allocating(self):
+        ring = BroadcastRingBuffer(8, dtype=np.float32, scale=1 / 32768)
+        reader = ring.create_reader()
+        ring.write(np.array([16384, -32768, 0], dtype=np.int16))
+
+        out = np.zeros(2, dtype=np.float32)
+        self.assertTrue(reader.read_into(out))
+        np.testing.assert_array_equal(out, [0.5, -1.0])
+        self.assertFalse(reader.read_into(out))
+        self.assertEqual(len(reader), 1)
+
+    def test_seek_latest_skips_backlog(self):
+        ring = BroadcastRingBuffer(16)
+        reader = ring.create_reader()
+        ring.write(samples(0, 10))
+        reader.seek_latest(keep=3)
+        np.testing.assert_array_equal(reader.read(), samples(7, 10))
+        self.assertEqual(reader.dropped, 0)
+
+    def test_wait_wakes_on_write(self):
+        ring = BroadcastRingBuffer(16)
+        reader = ring.create_reader()
+        self.assertFalse(reader.wait(4, timeout=0.01))
+
+        threading.Timer(0.01, ring.write, (samples(0, 4),)).start()
+        self.assertTrue(reader.wait(4, timeout=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+from xiaozhi.services.protocols.typing import TaskKind
+from xiaozhi.utils.scheduler import TaskScheduler
+
+
+class TaskSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.scheduler = TaskScheduler(self.loop, max_size=4)
+        self.calls = []
+
+    def tearDown(self):
+        self.loop.close()
+
+    def task(self, name):
+        return lambda: self.calls.append(name)
+
+    def run_pending(self):
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def test_runs_by_priority_then_fifo(self):
+        self.scheduler.schedule(self.task("ui"), TaskKind.UI)
+        self.scheduler.schedule(self.task("state-1"), TaskKind.STATE)
+        self.scheduler.schedule(self.task("abort"), TaskKind.ABORT)
+        self.scheduler.schedule(self.task("state-2"), TaskKind.STATE)
+        self.run_pending()
+        self.assertEqual(self.calls, ["abort", "state-1", "state-2", "ui"])
+
+    def test_same_key_keeps_position_and_runs_latest(self):
+        self.scheduler.schedule(self.task("status-1"), TaskKind.UI, "status")
+        self.scheduler.schedule(self.task("emotion"), TaskKind.UI, "emotion")
+        self.scheduler.schedule(self.task("status-2"), TaskKind.UI, "status")
+        self.run_pending()
+        self.assertEqual(self.calls, ["status-2", "emotion"])
+        self.assertEqual(self.scheduler.coalesced, 1)
+
+    def test_keys_are_per_kind_and_per_role(self):
+        self.scheduler.schedule(
+            self.task("assistant"), TaskKind.UI, "chat_message:assistant"
+        )
+        self.scheduler.schedule(self.task("user"), TaskKind.UI, "chat_message:user")
+        self.scheduler.schedule(self.task("state"), TaskKind.STATE, "status")
+        self.scheduler.schedule(self.task("ui"), TaskKind.UI, "status")
+        self.run_pending()
+        self.assertEqual(self.calls, ["state", "assistant", "user", "ui"])
+        self.assertEqual(self.scheduler.coalesced, 0)
+
+    def test_tasks_without_key_are_never_coalesced(self):
+        for i in range(3):
+            self.scheduler.schedule(self.task(i))
+        self.run_pending()
+        self.assertEqual(self.calls, [0, 1, 2])
+
+    def test_full_queue_evicts_oldest_lower_priority_task(self):
+        for i in range(4):
+            self.scheduler.schedule(self.task(f"ui-{i}"), TaskKind.UI)
+        self.scheduler.schedule(self.task("abort"), TaskKind.ABORT)
+        self.run_pending()
+        self.assertEqual(self.calls, ["abort", "ui-1", "ui-2", "ui-3"])
+        self.assertEqual(self.scheduler.dropped[TaskKind.UI], 1)
+
+    def test_full_queue_drops_new_lower_priority_task(self):
+        for i in range(4):
+            self.scheduler.schedule(self.task(f"state-{i}"), TaskKind.STATE)
+        self.scheduler.schedule(self.task("ui"), TaskKind.UI)
+        self.run_pending()
+        self.assertEqual(self.calls, [f"state-{i}" for i in range(4)])
+        self.assertEqual(self.scheduler.dropped[TaskKind.UI], 1)
+        self.assertEqual(self.scheduler.dropped[TaskKind.STATE], 0)
+
+    def test_failing_task_does_not_stop_the_rest(self):
+        self.scheduler.schedule(lambda: 1 / 0)
+        self.scheduler.schedule(self.task("next"))
+        self.run_pending()
+        self.assertEqual(self.calls, ["next"])
+        self.assertEqual(self.scheduler.get_metrics()["depth"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
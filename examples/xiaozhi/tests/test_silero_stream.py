@@ -0,0 +1,48 @@
+import os
+import unittest
+
+import numpy as np
+
+from xiaozhi.utils.file import get_model_file_path
+
+# 模型文件需要从 release 下载，没有时跳过
+MODEL = get_model_file_path("silero_vad.onnx")
+
+
+def frames(count: int, seed: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return list(rng.normal(0, 3000, (count, 512)).astype(np.int16))
+
+
+@unittest.skipUnless(os.path.exists(MODEL), "silero_vad.onnx 不存在")
+class SileroStreamTest(unittest.TestCase):
+    def setUp(self):
+        from xiaozhi.services.audio.vad.silero import Silero, SileroStream
+
+        self.silero = Silero
+        self.session = Silero.model.session
+        self.stream = SileroStream(self.session)
+        self.fresh = SileroStream(self.session)
+
+    def test_reset_forgets_previous_audio(self):
+        for frame in frames(20, 0):
+            self.stream(frame)
+        after = frames(3, 1)
+
+        self.stream.reset()
+        self.assertEqual(
+            [self.stream(frame) for frame in after],
+            [self.fresh(frame) for frame in after],
+        )
+
+    def test_silero_reset_clears_cached_stream(self):
+        for frame in frames(20, 0):
+            self.silero.vad(frame, 16000)
+        frame = frames(1, 1)[0]
+
+        self.silero.reset(16000)
+        self.assertEqual(self.silero.vad(frame, 16000), self.fresh(frame))
+
+
+if __name__ == "__main__":
+    unittest.main()
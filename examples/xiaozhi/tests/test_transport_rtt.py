@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.transport_rtt import compare
+
+COUNT = 50
+
+
+class TransportRttTest(unittest.IsolatedAsyncioTestCase):
+    """用本机的替身 broker / UDP 回声服务对比两种传输的往返延迟（宽松的上限，只防止明显退化）"""
+
+    async def test_mqtt_udp_is_not_slower_than_websocket(self):
+        results = await compare(COUNT)
+        websocket, mqtt = results["WebSocket"], results["MQTT + UDP"]
+        self.assertEqual(len(websocket), COUNT)
+        self.assertEqual(len(mqtt), COUNT)
+
+        websocket_p50, mqtt_p50 = np.percentile(websocket, 50), np.percentile(mqtt, 50)
+        self.assertLess(websocket_p50, 50)
+        self.assertLess(mqtt_p50, 50)
+        # 本机回环上 UDP 应该和 WebSocket 差不多快（通常更快），留出调度抖动的余量
+        self.assertLess(mqtt_p50, websocket_p50 * 2 + 5)
+
+    async def test_udp_loss_drops_packets_without_delaying_the_rest(self):
+        results = await compare(COUNT, loss=0.2)
+        mqtt = results["MQTT + UDP"]
+        # 丢掉的包直接丢失，不会像 TCP 那样阻塞后面的包
+        self.assertLess(len(mqtt), COUNT)
+        self.assertGreater(len(mqtt), 0)
+        self.assertLess(np.percentile(mqtt, 95), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+
+from xiaozhi.services.protocols.protocol import Protocol
+
+
+class FakeProtocol(Protocol):
+    def __init__(self):
+        super().__init__()
+        self.opened = True
+        self.write_buffer = 0
+        self.fail = False
+        self.sent = []
+
+    def is_audio_channel_opened(self) -> bool:
+        return self.opened
+
+    def get_write_buffer_size(self) -> int:
+        return self.write_buffer
+
+    async def send_audio_frame(self, frame: bytes):
+        if self.fail:
+            raise ConnectionError("closed")
+        self.sent.append(frame)
+
+
+def frames(start: int, stop: int) -> list[bytes]:
+    return [bytes([i]) for i in range(start, stop)]
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class UplinkTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.protocol = FakeProtocol()
+
+    async def asyncTearDown(self):
+        if self.protocol.uplink_task:
+            self.protocol.uplink_task.cancel()
+
+    async def test_sends_in_order(self):
+        await self.protocol.send_audio(frames(0, 3))
+        await self.protocol.send_audio(frames(3, 5))
+        await drain()
+        self.assertEqual(self.protocol.sent, frames(0, 5))
+        self.assertEqual(self.protocol.uplink_latency.count, 5)
+
+    async def test_reconnect_replays_whole_utterance(self):
+        await self.protocol.send_audio(frames(0, 2))
+        await drain()
+
+        # 说话过程中断线：继续录音，先缓存起来
+        self.protocol.opened = False
+        await self.protocol.send_audio(frames(2, 5))
+        await drain()
+        self.assertTrue(self.protocol.uplink_hold)
+        self.assertEqual(self.protocol.get_uplink_metrics()["held"], 3)
+
+        # 重连后新的会话收到本次说话的全部录音，之后继续实时发送
+        self.protocol.opened = True
+        self.protocol.sent.clear()
+        await self.protocol.resume_uplink(True)
+        await self.protocol.send_audio(frames(5, 6))
+        await drain()
+        self.assertEqual(self.protocol.sent, frames(0, 6))
+        self.assertEqual(self.protocol.uplink_replayed, 5)
+        self.assertFalse(self.protocol.uplink_hold)
+
+    async def test_reconnect_without_replay_drops_held_frames(self):
+        self.protocol.opened = False
+        await self.protocol.send_audio(frames(0, 3))
+        await drain()
+
+        self.protocol.opened = True
+        await self.protocol.resume_uplink(False)
+        await self.protocol.send_audio(frames(3, 4))
+        await drain()
+        self.assertEqual(self.protocol.sent, frames(3, 4))
+        self.assertEqual(self.protocol.uplink_dropped["closed"], 3)
+
+    async def test_replay_skips_expired_frames(self):
+        self.protocol.opened = False
+        await self.protocol.send_audio(frames(0, 4))
+        await drain()
+        # 前两帧已经超过补发的最大时长
+        for entry in list(self.protocol.uplink_backlog)[:2]:
+            entry[1] -= self.protocol.uplink_replay_max_age + 1
+
+        self.protocol.opened = True
+        await self.protocol.resume_uplink(True)
+        self.assertEqual(self.protocol.sent, frames(2, 4))
+        self.assertEqual(self.protocol.uplink_dropped["expired"], 2)
+
+    async def test_send_error_holds_for_replay(self):
+        self.protocol.fail = True
+        await self.protocol.send_audio(frames(0, 2))
+        await drain()
+        self.assertTrue(self.protocol.uplink_hold)
+        self.assertEqual(self.protocol.uplink_dropped["error"], 1)
+
+        self.protocol.fail = False
+        await self.protocol.resume_uplink(True)
+        self.assertEqual(self.protocol.sent, frames(0, 2))
+
+    async def test_high_water_drops_until_queue_is_short(self):
+        self.protocol.uplink_congested_queue = 5
+        self.protocol.write_buffer = self.protocol.uplink_high_water + 1
+        await self.protocol.send_audio(frames(0, 8))
+        await drain()
+        # 积压时只保留最新的几帧
+        self.assertEqual(self.protocol.sent, frames(3, 8))
+        self.assertEqual(self.protocol.uplink_dropped["congested"], 3)
+
+    async def test_full_queue_drops_oldest(self):
+        self.protocol.uplink_max_queue = 4
+        await self.protocol.send_audio(frames(0, 6))
+        await drain()
+        self.assertEqual(self.protocol.sent, frames(2, 6))
+        self.assertEqual(self.protocol.uplink_dropped["overflow"], 2)
+        self.assertEqual(self.protocol.uplink_max_depth, 4)
+
+    async def test_reset_discards_pending_audio(self):
+        self.protocol.opened = False
+        await self.protocol.send_audio(frames(0, 3))
+        self.protocol.reset_uplink()
+        await drain()
+        self.assertEqual(len(self.protocol.uplink_backlog), 0)
+        self.assertTrue(self.protocol.uplink_queue.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -115,6 +115,12 @@ class __EventManager:
         xiaozhi = get_xiaozhi()
 
         # 先取消之前的 VAD 检测和音频输入输出流
+        # 用户打断时正在播放的回复立即停止；TTS 正常结束时让剩下的音频播完
+        if xiaozhi.device_state == DeviceState.SPEAKING and self.current_step in [
+            Step.on_interrupt,
+            Step.on_wakeup,
+        ]:
+            codec.flush_output()
         xiaozhi.set_device_state(DeviceState.IDLE)
         await xiaozhi.protocol.send_abort_speaking(AbortReason.ABORT)
 
@@ -129,26 +135,50 @@ class __EventManager:
             if step != Step.on_silence:
                 return
 
-        # 检查是否有人说话
-        vad.resume("speech")
-        step, speech_buffer = await self.wait_next_step(
-            timeout=APP_CONFIG["wakeup"]["timeout"]
-        )
-        if step == "timeout":
-            # 如果没人说话，则回到 IDLE 状态
-            xiaozhi.set_device_state(DeviceState.IDLE)
-            print("👋 已退出唤醒")
-            after_wakeup = APP_CONFIG["wakeup"]["after_wakeup"]
-            await after_wakeup(speaker)
-            return
-        if step != Step.on_speech:
-            return
+        while True:
+            # 检查是否有人说话
+            vad.resume("speech")
+            step, speech_buffer = await self.wait_next_step(
+                timeout=APP_CONFIG["wakeup"]["timeout"]
+            )
+            if step == "timeout":
+                # 如果没人说话，则回到 IDLE 状态
+                xiaozhi.set_device_state(DeviceState.IDLE)
+                print("👋 已退出唤醒")
+                after_wakeup = APP_CONFIG["wakeup"]["after_wakeup"]
+                await after_wakeup(speaker)
+                return
+            if step != Step.on_speech:
+                return
 
-        # 开始说话
-        set_speech_frames(speech_buffer)
-        codec.input_stream.start_stream()  # 开启录音
-        await xiaozhi.protocol.send_start_listening(ListeningMode.MANUAL)
-        xiaozhi.set_device_state(DeviceState.LISTENING)
+            # 开始说话（先上传预录的音频）
+            if not await xiaozhi.connection.ensure_connected():
+                print("❌ 无法连接服务器，已取消本次对话")
+                xiaozhi.set_device_state(DeviceState.IDLE)
+                return
+            xiaozhi.protocol.reset_uplink()
+            set_speech_frames(speech_buffer)
+            codec.input_stream.start_stream()  # 开启录音
+            await xiaozhi.protocol.send_start_listening(ListeningMode.MANUAL)
+            xiaozhi.set_device_state(DeviceState.LISTENING)
+
+            if not vad.speculative:
+                break
+
+            # 预上传模式：边上传边确认是否真的在说话
+            vad.resume("confirm")
+            step, _ = await self.wait_next_step()
+            if step == Step.on_speech:
+                break
+            if step != Step.on_silence:
+                return
+
+            # 只是噪音，取消本次上传（丢弃还没发出的录音并结束监听），继续等待说话
+            print("🔇 未检测到有效语音，已取消")
+            xiaozhi.set_device_state(DeviceState.IDLE)
+            xiaozhi.protocol.reset_uplink()
+            await xiaozhi.protocol.send_stop_listening()
+            await xiaozhi.protocol.send_abort_speaking(AbortReason.ABORT)
 
         # 等待说话结束
         vad.resume("silence")
@@ -161,6 +191,8 @@ class __EventManager:
         xiaozhi.set_device_state(DeviceState.IDLE)
 
     async def wakeup(self, text, source):
+        # 和唤醒提示语并行，提前确认/重建连接
+        get_xiaozhi().connection.warm_up()
         before_wakeup = APP_CONFIG["wakeup"]["before_wakeup"]
         get_kws().pause()  # 暂停 KWS 检测
         wakeup = await before_wakeup(get_speaker(), text, source)
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class AGC:
+    """
+    自动增益控制
+
+    每段采集音频只计算一次目标增益，按 attack/release 平滑后在段内线性过渡，
+    并根据峰值限制增益、对结果做饱和截断，避免大声说话时 int16 溢出失真。
+    默认最大增益 20dB，和原来固定放大 10 倍一致，VAD/KWS 的阈值不用重新调整
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        target_level: float = -20,
+        max_gain: float = 20,
+        attack: float = 10,
+        release: float = 500,
+    ):
+        """
+        参数:
+            sample_rate: 采样率
+            target_level: 目标音量（dBFS）
+            max_gain: 最大增益（dB）
+            attack: 音量变大时增益下降的时间常数（ms）
+            release: 音量变小时增益恢复的时间常数（ms）
+        """
+        self.sample_rate = sample_rate
+        self.target_level = target_level
+        self.max_gain = 10 ** (max_gain / 20)
+        self.attack = attack
+        self.release = release
+
+        self.gain = self.max_gain  # 当前增益（倍数）
+        self.limited_samples = 0  # 因峰值保护被压低增益的采样数
+
+    @property
+    def gain_db(self) -> float:
+        return 20 * np.log10(self.gain)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """对一段 int16 音频做增益处理，返回新的 int16 数组"""
+        n = len(samples)
+        if n == 0:
+            return samples
+
+        x = samples.astype(np.float32)
+        rms = np.sqrt(np.dot(x, x) / n)
+        peak = float(np.max(np.abs(x)))
+
+        # 期望增益：把音量拉到目标值，且不超过最大增益
+        level = 20 * np.log10(rms / 32768.0 + 1e-9)
+        desired = min(10 ** ((self.target_level - level) / 20), self.max_gain)
+
+        # 按 attack/release 平滑增益变化
+        duration = n * 1000 / self.sample_rate
+        tau = self.attack if desired < self.gain else self.release
+        gain = self.gain + (1 - np.exp(-duration / tau)) * (desired - self.gain)
+
+        # 峰值保护：放大后不能超过 int16 的范围
+        limit = 32767.0 / peak if peak > 0 else self.max_gain
+        if max(self.gain, gain) > limit:
+            self.limited_samples += n
+        start = min(self.gain, limit)
+        gain = min(gain, limit)
+
+        # 段内从上一次的增益线性过渡到新的增益，避免增益跳变产生爆音
+        x *= np.linspace(start, gain, n, dtype=np.float32)
+        self.gain = max(gain, 1e-3)
+        return np.clip(x, -32768, 32767).astype(np.int16)
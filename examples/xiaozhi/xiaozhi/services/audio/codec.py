@@ -1,15 +1,49 @@
+import threading
+import time
+
 import opuslib_next as opuslib
 
+from config import APP_CONFIG
 from xiaozhi.ref import (
     get_speech_frames,
     get_xiaozhi,
     set_audio_codec,
     set_speech_frames,
 )
-from xiaozhi.services.audio.stream import MyAudio
+from xiaozhi.services.audio.jitter import JitterBuffer
+from xiaozhi.services.audio.stream import GlobalStream, MyAudio, MyStream
+from xiaozhi.services.audio.worker import CodecWorker, StageStats
 from xiaozhi.services.protocols.typing import AudioConfig
 from xiaozhi.utils.base import get_env
 
+# Opus 解码器支持直接输出的采样率
+OPUS_SAMPLE_RATES = [8000, 12000, 16000, 24000, 48000]
+
+
+def create_opus_encoder(
+    frame_duration=60,
+    application="audio",
+    bitrate=None,
+    complexity=None,
+    dtx=False,
+):
+    """按配置创建上行 Opus 编码器"""
+    if frame_duration not in [20, 40, 60]:
+        raise ValueError(f"不支持的 Opus 帧时长: {frame_duration}ms（可选 20/40/60）")
+
+    encoder = opuslib.Encoder(
+        fs=AudioConfig.SAMPLE_RATE,
+        channels=AudioConfig.CHANNELS,
+        application=application,
+    )
+    if bitrate:
+        encoder.bitrate = bitrate
+    if complexity is not None:
+        encoder.complexity = complexity
+    if dtx:
+        encoder.dtx = 1
+    return encoder
+
 
 class AudioCodec:
     """音频编解码器类，处理音频的录制和播放"""
@@ -23,9 +57,36 @@ class AudioCodec:
         self.opus_decoder = None
         self._is_closing = False
 
+        # Opus 解码时可以直接输出音箱的采样率，与服务端编码时的采样率无关；
+        # 音箱的采样率 Opus 不支持时按 48k 解码，由输出流重采样
+        self.output_sample_rate = AudioConfig.OUTPUT_SAMPLE_RATE
+        if self.output_sample_rate not in OPUS_SAMPLE_RATES:
+            self.output_sample_rate = 48000
+
+        # 上行录音编码在编解码线程里执行，下行解码在播放线程里执行
+        self.worker = CodecWorker()
+
+        # 下行音频先进入抖动缓冲，再由播放线程按帧解码播放
+        config = APP_CONFIG.get("jitter_buffer", {})
+        self.playout_lead = config.get("lead", 120) / 1000
+        self.jitter_buffer = JitterBuffer(
+            frame_duration=get_xiaozhi().protocol.server_frame_duration,
+            min_depth=config.get("min_depth", 2),
+            max_depth=config.get("max_depth", 8),
+            max_conceal=config.get("max_conceal", 2),
+        )
+        self.playout_thread = None
+        # 下行音频的代数：打断后加一，播放线程丢弃之前代数解码出的音频
+        self.output_generation = 0
+        # 打断到音箱停止出声的耗时
+        self.flush_latency = StageStats()
+
         self._initialize_audio()
         set_audio_codec(self)
 
+        self.playout_thread = threading.Thread(target=self._playout_loop, daemon=True)
+        self.playout_thread.start()
+
     def _initialize_audio(self):
         """初始化音频设备和编解码器"""
         self.audio = MyAudio.create()
@@ -45,25 +106,30 @@ class AudioCodec:
             output=True,
             format=AudioConfig.FORMAT,
             channels=AudioConfig.CHANNELS,
-            rate=get_xiaozhi().protocol.server_sample_rate,
-            frames_per_buffer=get_xiaozhi().protocol.server_frame_size,
+            rate=self.output_sample_rate,
+            frames_per_buffer=self.output_frame_size,
             output_device_index=MyAudio.get_output_device_index(self.audio),
         )
 
         # 初始化Opus编码器
-        self.opus_encoder = opuslib.Encoder(
-            fs=AudioConfig.SAMPLE_RATE,
-            channels=AudioConfig.CHANNELS,
-            application=opuslib.APPLICATION_AUDIO,
-        )
+        self.opus_encoder = create_opus_encoder(**APP_CONFIG.get("opus", {}))
 
         # 初始化Opus解码器
         self.opus_decoder = opuslib.Decoder(
-            fs=get_xiaozhi().protocol.server_sample_rate,
+            fs=self.output_sample_rate,
             channels=AudioConfig.CHANNELS,
         )
         self.temp_frames = bytes([])
 
+    @property
+    def output_frame_size(self) -> int:
+        """下行每帧解码出的采样数"""
+        return self.output_sample_rate * self.jitter_buffer.frame_duration // 1000
+
+    def set_output_frame_duration(self, frame_duration):
+        """按服务端协商的帧时长解码、播放下行音频"""
+        self.jitter_buffer.frame_duration = frame_duration
+
     def read_audio(self):
         """读取音频输入数据并编码"""
         try:
@@ -86,26 +152,75 @@ class AudioCodec:
             if len(self.temp_frames) < AudioConfig.FRAME_SIZE * 2:
                 return None
 
-            opus_frames, remain_frames = self.encode_audio(self.temp_frames)
+            opus_frames, remain_frames = self.worker.timed(
+                "encode", self.encode_audio, self.temp_frames
+            )
             self.temp_frames = remain_frames
             return opus_frames
         except Exception:
             return None
 
-    def write_audio(self, opus_data):
-        """解码并播放"""
-        try:
-            pcm_data = self.decode_audio(opus_data)  # 解码
-            self.output_stream.write(pcm_data)  # 播放
-        except Exception:
-            pass
+    def write_audio(self, opus_data, seq=None):
+        """放入抖动缓冲，由播放线程解码播放"""
+        self.jitter_buffer.put(opus_data, seq)
+
+    def _playout_loop(self):
+        """播放线程：按帧时长从抖动缓冲取数据解码播放（最多领先实时 lead）"""
+        deadline = None
+        while True:
+            item = self.jitter_buffer.get(timeout=0.5)
+            if item is None:
+                deadline = None
+                continue
+
+            generation = self.output_generation
+            try:
+                pcm_data = self.worker.timed("decode", self.decode_audio, *item)
+                if self.output_stream and generation == self.output_generation:
+                    self.output_stream.write(pcm_data)  # 播放
+            except Exception:
+                pass
+
+            now = time.monotonic()
+            frame_duration = self.jitter_buffer.frame_duration / 1000
+            deadline = max(deadline or now, now - self.playout_lead) + frame_duration
+            if deadline - now > self.playout_lead:
+                time.sleep(deadline - now - self.playout_lead)
+
+    def flush_output(self):
+        """打断时丢弃所有还没播放的下行音频（抖动缓冲、排队中的输出和音箱上的缓冲）"""
+        start = time.perf_counter()
+        self.output_generation += 1
+        self.jitter_buffer.reset()
+
+        future = None
+        if isinstance(self.output_stream, MyStream):
+            future = GlobalStream.flush_output()
+        if future is None:
+            self.flush_latency.add(time.perf_counter() - start)
+        else:
+            future.add_done_callback(
+                lambda _: self.flush_latency.add(time.perf_counter() - start)
+            )
+
+    def get_metrics(self) -> dict:
+        return {
+            "worker": self.worker.get_metrics(),
+            "jitter_buffer": self.jitter_buffer.get_metrics(),
+            "flush": self.flush_latency.to_dict(),
+        }
+
+    def decode_audio(self, kind, opus_data):
+        """
+        解码音频数据
 
-    def decode_audio(self, opus_data):
-        """解码音频数据"""
+        kind 为 packet 时正常解码，fec 时用 opus_data（下一个包）的带内 FEC 恢复当前帧，
+        plc 时做丢包补偿
+        """
         return self.opus_decoder.decode(
-            opus_data,
-            frame_size=get_xiaozhi().protocol.server_frame_size,
-            decode_fec=False,
+            opus_data or b"",
+            frame_size=self.output_frame_size,
+            decode_fec=kind == "fec",
         )
 
     def encode_audio(self, buffer: bytes, frame_size=AudioConfig.FRAME_SIZE):
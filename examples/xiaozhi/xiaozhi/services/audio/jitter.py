@@ -0,0 +1,234 @@
+import math
+import threading
+import time
+
+
+class JitterBuffer:
+    """
+    下行音频抖动缓冲
+
+    按序号缓存收到的 Opus 包，攒够目标深度后再开始按帧播放：
+    - 目标深度根据到达时间的抖动自适应调整，出现卡顿时加深
+    - 中间丢包时，下一个包已经到达则用带内 FEC 恢复，否则做丢包补偿（PLC）
+    - 整体断流时先做几帧 PLC，仍然没有数据就停止播放、重新缓冲
+    - 重新缓冲时一段时间没有新包到达（最后几帧凑不够目标深度），直接播完剩下的包
+    - 服务端已经发完（end）时剩下的包直接播完，播完后不做 PLC
+    - 晚于播放位置到达（或重复）的包直接丢弃
+
+    get/pop 返回 (类型, 数据)：
+    - ("packet", 包)：正常解码
+    - ("fec", 下一个包)：用下一个包的 FEC 数据恢复当前帧
+    - ("plc", None)：丢包补偿
+    """
+
+    def __init__(
+        self,
+        frame_duration: float = 60,
+        min_depth: int = 2,
+        max_depth: int = 8,
+        max_conceal: int = 2,
+        capacity: int = 500,
+    ):
+        """
+        参数:
+            frame_duration: 每个包的时长（ms）
+            min_depth/max_depth: 目标缓冲深度的下限/上限（帧）
+            max_conceal: 断流时最多连续补偿的帧数
+            capacity: 最多缓存的包数，超出时丢弃最早的包
+        """
+        self.frame_duration = frame_duration
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.max_conceal = max_conceal
+        self.capacity = capacity
+
+        self._cond = threading.Condition()
+        self.reset()
+
+        # 统计
+        self.received = 0  # 收到的包
+        self.late = 0  # 迟到（或重复）被丢弃的包
+        self.overflow = 0  # 缓存溢出被丢弃的包
+        self.underruns = 0  # 断流次数
+        self.concealed = 0  # PLC 补偿的帧数
+        self.recovered = 0  # FEC 恢复的帧数
+
+    def reset(self):
+        """清空缓冲（开始新的会话）"""
+        with self._cond:
+            self.packets: dict[int, bytes] = {}
+            self.next_seq = None  # 下一个要播放的序号
+            self.playing = False
+            self.conceal_count = 0
+            self.conceal_debt = 0  # 断流时已经补偿过、但序号还没推进的帧数
+            self.ended = False  # 服务端已经发完，剩下的包播完即止
+            self.jitter = 0.0  # 到达时间抖动（ms）
+            self.target_depth = self.min_depth
+            self._auto_seq = 0
+            self._last_arrival = None
+            self._last_seq = None
+            self._last_put = None
+            self._cond.notify_all()
+
+    def end(self):
+        """服务端已经发完（tts stop）：不再等待凑够目标深度，播完剩下的包后停止"""
+        with self._cond:
+            self.ended = True
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        """当前缓存的包数"""
+        return len(self.packets)
+
+    def put(self, packet: bytes, seq: int = None, arrival: float = None):
+        """
+        送入一个包
+
+        参数:
+            packet: Opus 包
+            seq: 序号，为空时按到达顺序编号（WebSocket 是有序的）
+            arrival: 到达时间（秒），为空时使用当前时间
+        """
+        with self._cond:
+            if seq is None:
+                seq = self._auto_seq
+            if self.ended and not self.playing and not self.packets:
+                # 上一段已经播完，新的一段语音重新攒够目标深度再播放
+                self.ended = False
+            arrival = time.monotonic() if arrival is None else arrival
+            self._auto_seq = max(self._auto_seq, seq + 1)
+            self._last_put = arrival
+            self.received += 1
+            self._update_jitter(seq, arrival)
+
+            if (self.next_seq is not None and seq < self.next_seq) or (
+                seq in self.packets
+            ):
+                self.late += 1
+                return
+
+            self.packets[seq] = packet
+            if len(self.packets) > self.capacity:
+                self.packets.pop(min(self.packets))
+                self.overflow += 1
+            self._cond.notify_all()
+
+    def _update_jitter(self, seq: int, arrival: float):
+        """
+        按 RFC 3550 的方式估计到达时间抖动，并据此调整目标深度
+
+        只统计比预期晚到的部分：服务端一次性推送的包提前到达不会造成断流。
+        间隔超过最大缓冲时长的（句子、对话之间的静音）当作新的一段语音，不计入抖动
+        """
+        if self._last_arrival is not None and seq > self._last_seq:
+            expected = (seq - self._last_seq) * self.frame_duration
+            delta = (arrival - self._last_arrival) * 1000 - expected
+            if delta <= self.max_depth * self.frame_duration:
+                self.jitter += (max(delta, 0) - self.jitter) / 16
+            depth = 1 + math.ceil(2 * self.jitter / self.frame_duration)
+            self.target_depth = min(max(depth, self.min_depth), self.max_depth)
+        if self._last_seq is None or seq > self._last_seq:
+            self._last_arrival = arrival
+            self._last_seq = seq
+
+    @property
+    def idle_timeout(self) -> float:
+        """重新缓冲时超过这么久（秒）没有新包，就不再等待凑够目标深度"""
+        return self.target_depth * self.frame_duration / 1000
+
+    def _ready(self, now: float) -> bool:
+        if self.playing or len(self.packets) >= self.target_depth:
+            return True
+        if not self.packets:
+            return False
+        return self.ended or now - self._last_put >= self.idle_timeout
+
+    def pop(self, now: float = None):
+        """
+        取出下一帧（不阻塞），没有可播放的数据时返回 None
+
+        参数:
+            now: 当前时间（秒），为空时使用当前时间（和 put 的 arrival 同一时钟）
+        """
+        with self._cond:
+            if not self.playing:
+                if not self._ready(time.monotonic() if now is None else now):
+                    return None
+                # 重新缓冲期间没到的包已经来不及播放了，从最早的包开始
+                self.next_seq = min(self.packets)
+                self.playing = True
+
+            packet = self.packets.pop(self.next_seq, None)
+            if packet is None and self.packets:
+                # 断流期间补偿过的帧其实是丢了，跳过它们，避免重复补偿拉长延迟
+                while self.conceal_debt and self.next_seq not in self.packets:
+                    self.next_seq += 1
+                    self.conceal_debt -= 1
+                packet = self.packets.pop(self.next_seq, None)
+            if packet is not None:
+                self.next_seq += 1
+                self.conceal_count = 0
+                self.conceal_debt = 0
+                return "packet", packet
+
+            if self.packets:
+                # 中间丢包：能用下一个包的 FEC 恢复就恢复，否则补偿
+                self.next_seq += 1
+                following = self.packets.get(self.next_seq)
+                if following is not None:
+                    self.recovered += 1
+                    return "fec", following
+                self.concealed += 1
+                return "plc", None
+
+            if self.ended:
+                # 服务端已经发完，没有丢包，不需要补偿
+                self.playing = False
+                self.conceal_count = 0
+                self.conceal_debt = 0
+                return None
+
+            # 断流：先补偿几帧（不推进序号，晚到的包还能接着播放）
+            if self.conceal_count == 0:
+                self.underruns += 1
+                self.target_depth = min(self.target_depth + 1, self.max_depth)
+            if self.conceal_count < self.max_conceal:
+                self.conceal_count += 1
+                self.conceal_debt += 1
+                self.concealed += 1
+                return "plc", None
+
+            # 仍然没有数据，停止播放并重新缓冲
+            self.playing = False
+            self.conceal_count = 0
+            self.conceal_debt = 0
+            return None
+
+    def get(self, timeout: float = None):
+        """取出下一帧，未在播放时阻塞等待缓冲到目标深度（或者等到剩下的包可以直接播完）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._ready(time.monotonic()):
+                # 有包在等待时按帧检查一次是否已经空闲太久
+                wait = self.frame_duration / 1000 if self.packets else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+        return self.pop()
+
+    def get_metrics(self) -> dict:
+        return {
+            "depth": self.depth,
+            "target_depth": self.target_depth,
+            "jitter_ms": self.jitter,
+            "received": self.received,
+            "late": self.late,
+            "overflow": self.overflow,
+            "underruns": self.underruns,
+            "concealed": self.concealed,
+            "recovered": self.recovered,
+        }
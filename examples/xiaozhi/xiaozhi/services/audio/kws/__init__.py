@@ -1,13 +1,14 @@
 import asyncio
 import os
 import threading
-import time
+
+import numpy as np
 
 from config import APP_CONFIG
 from xiaozhi.event import EventManager
 from xiaozhi.ref import get_speaker, get_xiaoai, get_xiaozhi, set_kws
 from xiaozhi.services.audio.kws.sherpa import SherpaOnnx
-from xiaozhi.services.audio.stream import MyAudio
+from xiaozhi.services.audio.stream import MyAudio, MyStream
 from xiaozhi.services.protocols.typing import AudioConfig, DeviceState
 from xiaozhi.utils.base import get_env
 
@@ -16,20 +17,39 @@ class _KWS:
     def __init__(self):
         set_kws(self)
 
+        self.sample_rate = 16000
+        # 每次送入模型的音频长度固定为 20ms
+        self.chunk_size = self.sample_rate * 20 // 1000
+        # 恢复检测时保留的历史音频，其余积压的音频直接丢弃
+        self.pre_roll = APP_CONFIG["wakeup"].get("pre_roll", 300)
+        # 当前分片（从采集总线直接读入归一化的 float32 音频，循环复用）
+        self.chunk = np.zeros(self.chunk_size, dtype=np.float32)
+
+        self.audio = None
+        self.stream = None
+        self.paused = False
+        self.suspended = True
+        self.resumed = threading.Event()  # 恢复检测时唤醒检测线程
+        # 状态回调（事件循环线程）、pause/resume 和检测线程都会更新暂停状态
+        self.suspend_lock = threading.Lock()
+
     def start(self):
         if not get_env("CLI"):
             return
 
         self.audio = MyAudio.create()
         self.stream = self.audio.open(
-            format=AudioConfig.FORMAT,
+            format=AudioConfig.FLOAT_FORMAT,
             channels=1,
-            rate=16000,
+            rate=self.sample_rate,
             input=True,
-            frames_per_buffer=AudioConfig.FRAME_SIZE,
+            frames_per_buffer=self.chunk_size,
             start=True,
         )
 
+        # 在说话和监听状态时，暂停 KWS
+        get_xiaozhi().on_state_changed(lambda _: self._update_suspended())
+
         # 启动 KWS 服务
         self.paused = False
         self.thread = threading.Thread(target=self._detection_loop, daemon=True)
@@ -41,36 +61,70 @@ class _KWS:
 
     def pause(self):
         self.paused = True
+        self._update_suspended()
 
     def resume(self):
         self.paused = False
+        self._update_suspended()
+
+    def _is_suspended(self):
+        return self.paused or get_xiaozhi().device_state in [
+            DeviceState.LISTENING,
+            DeviceState.SPEAKING,
+        ]
+
+    def _update_suspended(self):
+        with self.suspend_lock:
+            suspended = self._is_suspended()
+            if suspended == self.suspended:
+                return
+
+            self.suspended = suspended
+            if suspended:
+                self.resumed.clear()
+                return
+
+            # 暂停期间不读取音频，恢复时只保留一小段预录音频
+            if isinstance(self.stream, MyStream):
+                self.stream.skip(self.sample_rate * self.pre_roll // 1000)
+            self.resumed.set()
+
+    def _read_chunk(self):
+        """读取一个分片，数据不足时返回 None"""
+        if isinstance(self.stream, MyStream):
+            return self.chunk if self.stream.read_into(self.chunk) else None
+        frames = self.stream.read(self.chunk_size, exception_on_overflow=False)
+        return np.frombuffer(frames, dtype=np.float32)
 
     def _detection_loop(self):
         SherpaOnnx.start()
         self.stream.start_stream()
+        self._update_suspended()
         while True:
-            # 读取缓冲区音频数据
-            frames = self.stream.read()
-
-            # 在说话和监听状态时，暂停 KWS
-            if (
-                not frames
-                or self.paused
-                or get_xiaozhi().device_state
-                in [
-                    DeviceState.LISTENING,
-                    DeviceState.SPEAKING,
-                ]
+            if self.suspended:
+                self.resumed.wait()
+                continue
+
+            # 等待采集总线写入一个完整的分片（PyAudio 的 read 本身是阻塞的）
+            if isinstance(self.stream, MyStream) and not self.stream.wait(
+                self.chunk_size, timeout=0.1
             ):
-                time.sleep(0.01)
                 continue
 
-            result = SherpaOnnx.kws(frames)
-            if result:
-                print(f"🔥 触发唤醒: {result}")
-                self.on_message(result)
+            # 一次性处理所有已就绪的分片
+            while not self.suspended:
+                frames = self._read_chunk()
+                if frames is None:
+                    break
+
+                result = SherpaOnnx.kws(frames)
+                if result:
+                    print(f"🔥 触发唤醒: {result}")
+                    self.on_message(result)
 
     def on_message(self, text: str):
+        # 和唤醒提示语并行，提前确认/重建连接
+        get_xiaozhi().connection.warm_up()
         asyncio.run_coroutine_threadsafe(
             EventManager.wakeup(text, "kws"),
             get_xiaoai().async_loop,
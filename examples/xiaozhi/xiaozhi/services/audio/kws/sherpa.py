@@ -1,36 +1,90 @@
+import threading
+from typing import Hashable
+
 import numpy as np
 import sherpa_onnx
 
 from xiaozhi.utils.file import get_model_file_path
 
+# 本机麦克风对应的默认音频流
+DEFAULT_STREAM = "default"
+
 
 class _SherpaOnnx:
+    """
+    唤醒词检测
+
+    所有音频流（每台音箱/每路麦克风一个）共用同一个 KeywordSpotter，
+    已就绪的音频流会通过 decode_streams 一起解码，结果再按音频流分发
+    """
+
+    def __init__(self):
+        self.keyword_spotter = None
+        self.streams: dict[Hashable, sherpa_onnx.OnlineStream] = {}
+        self._lock = threading.Lock()
+
     def start(self):
-        self.keyword_spotter = sherpa_onnx.KeywordSpotter(
-            provider="cpu",
-            num_threads=1,
-            max_active_paths=4,
-            keywords_score=2.0,
-            keywords_threshold=0.2,
-            num_trailing_blanks=1,
-            keywords_file=get_model_file_path("keywords.txt"),
-            tokens=get_model_file_path("tokens.txt"),
-            encoder=get_model_file_path("encoder.onnx"),
-            decoder=get_model_file_path("decoder.onnx"),
-            joiner=get_model_file_path("joiner.onnx"),
-        )
-        self.stream = self.keyword_spotter.create_stream()
+        if self.keyword_spotter is None:
+            self.keyword_spotter = sherpa_onnx.KeywordSpotter(
+                provider="cpu",
+                num_threads=1,
+                max_active_paths=4,
+                keywords_score=2.0,
+                keywords_threshold=0.2,
+                num_trailing_blanks=1,
+                keywords_file=get_model_file_path("keywords.txt"),
+                tokens=get_model_file_path("tokens.txt"),
+                encoder=get_model_file_path("encoder.onnx"),
+                decoder=get_model_file_path("decoder.onnx"),
+                joiner=get_model_file_path("joiner.onnx"),
+            )
+        self.add_stream(DEFAULT_STREAM)
+
+    def add_stream(self, key: Hashable):
+        """为一路音频流创建独立的解码状态"""
+        with self._lock:
+            if key not in self.streams:
+                self.streams[key] = self.keyword_spotter.create_stream()
+
+    def remove_stream(self, key: Hashable):
+        with self._lock:
+            self.streams.pop(key, None)
+
+    def accept(self, key: Hashable, frames):
+        """送入一段 int16 音频（或已归一化的 float32 音频）"""
+        samples = frames
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(frames, dtype=np.int16)
+        if samples.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        with self._lock:
+            self.streams[key].accept_waveform(16000, samples)
+
+    def decode(self) -> dict[Hashable, str]:
+        """批量解码所有已就绪的音频流，返回各音频流检测到的唤醒词"""
+        results = {}
+        with self._lock:
+            while True:
+                ready = [
+                    (key, stream)
+                    for key, stream in self.streams.items()
+                    if self.keyword_spotter.is_ready(stream)
+                ]
+                if not ready:
+                    break
+
+                self.keyword_spotter.decode_streams([stream for _, stream in ready])
+                for key, stream in ready:
+                    result = self.keyword_spotter.get_result(stream)
+                    if result:
+                        self.keyword_spotter.reset_stream(stream)
+                        results.setdefault(key, result.lower())
+        return results
 
     def kws(self, frames):
-        samples = np.frombuffer(frames, dtype=np.int16)
-        samples = samples.astype(np.float32) / 32768.0
-        self.stream.accept_waveform(16000, samples)
-        while self.keyword_spotter.is_ready(self.stream):
-            self.keyword_spotter.decode_stream(self.stream)
-            result = self.keyword_spotter.get_result(self.stream)
-            if result:
-                self.keyword_spotter.reset_stream(self.stream)
-                return result.lower()
+        """检测本机麦克风的唤醒词"""
+        self.accept(DEFAULT_STREAM, frames)
+        return self.decode().get(DEFAULT_STREAM)
 
 
 SherpaOnnx = _SherpaOnnx()
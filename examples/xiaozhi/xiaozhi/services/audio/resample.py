@@ -0,0 +1,59 @@
+from math import gcd
+
+import numpy as np
+
+
+class Resampler:
+    """
+    多相 FIR 重采样（int16 单声道，支持流式输入）
+
+    按 out_rate/in_rate 化简后的 up/down 设计一个 Kaiser 窗的低通原型滤波器，
+    拆成 up 组相位系数。每段输入一次性算出所有输出点的输入位置和相位，
+    用一次矩阵运算得到结果，没有逐采样的 Python 循环
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps: int = 16):
+        """
+        参数:
+            in_rate/out_rate: 输入/输出采样率
+            taps: 每个相位的滤波器长度，越长越接近理想低通，计算量也越大
+        """
+        g = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps = taps
+
+        # 原型低通滤波器（在上采样后的采样率下设计）
+        length = self.up * taps
+        cutoff = 0.5 / max(self.up, self.down) * 0.9
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0)
+        h *= self.up / h.sum()
+
+        # phases[p, k] 与 x[i - taps + 1 + k] 相乘（已按卷积方向翻转）
+        self.phases = h.reshape(taps, self.up).T[:, ::-1].astype(np.float32)
+        self.offsets = np.arange(taps)
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.position = 0  # 下一个输出点在上采样序列中相对当前输入段起点的位置
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """重采样一段 int16 音频，返回 int16 数组"""
+        if self.up == self.down:
+            return samples
+
+        x = np.concatenate([self.history, samples.astype(np.float32)])
+        total = len(samples) * self.up
+        m = np.arange(self.position, total, self.down)
+        self.position += len(m) * self.down - total
+        self.history = x[len(x) - (self.taps - 1) :]
+        if not len(m):
+            return np.zeros(0, dtype=np.int16)
+
+        index = (m // self.up)[:, None] + self.offsets
+        y = np.einsum("ij,ij->i", x[index], self.phases[m % self.up])
+        return np.clip(y, -32768, 32767).astype(np.int16)
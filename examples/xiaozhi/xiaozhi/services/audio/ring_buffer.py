@@ -0,0 +1,232 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """定长环形缓冲区，写满后丢弃最旧的数据"""
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        # 因溢出被丢弃的采样数
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def write(self, samples: np.ndarray) -> None:
+        """写入采样数据，空间不足时丢弃最旧的数据"""
+        n = len(samples)
+        if n == 0:
+            return
+
+        with self._lock:
+            cap = self._capacity
+            if n >= cap:
+                # 新数据已经超过容量，只保留最新的部分
+                self.dropped += self._size + n - cap
+                self._buffer[:] = samples[-cap:]
+                self._start = 0
+                self._size = cap
+                return
+
+            overflow = self._size + n - cap
+            if overflow > 0:
+                self.dropped += overflow
+                self._start = (self._start + overflow) % cap
+                self._size -= overflow
+
+            end = (self._start + self._size) % cap
+            first = min(n, cap - end)
+            self._buffer[end : end + first] = samples[:first]
+            if first < n:
+                self._buffer[: n - first] = samples[first:]
+            self._size += n
+
+    def read(self, n: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        读取并移除 n 个采样
+
+        数据不足 n 个时返回 None（不消费任何数据），n 为空时读取全部数据
+        """
+        with self._lock:
+            if n is None:
+                n = self._size
+            if n > self._size:
+                return None
+            data = self._copy(n)
+            self._start = (self._start + n) % self._capacity
+            self._size -= n
+            return data
+
+    def peek(self, n: Optional[int] = None) -> np.ndarray:
+        """读取（但不移除）最旧的 n 个采样"""
+        with self._lock:
+            return self._copy(self._size if n is None else min(n, self._size))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._start = 0
+            self._size = 0
+
+    def _copy(self, n: int) -> np.ndarray:
+        end = self._start + n
+        if end <= self._capacity:
+            return self._buffer[self._start : end].copy()
+        return np.concatenate(
+            (self._buffer[self._start :], self._buffer[: end - self._capacity])
+        )
+
+
+class BroadcastRingBuffer:
+    """
+    单写多读的环形缓冲区
+
+    数据只写入一次，每个读者（RingReader）只维护自己的读取位置，
+    读者落后超过容量时，最旧的数据会被覆盖（计入该读者的 dropped）
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16, scale: Optional[float] = None):
+        """
+        参数:
+            capacity: 最多保存的采样数
+            dtype: 缓冲区数据类型，写入时会原地转换
+            scale: 写入时对采样做的缩放（例如 int16 -> [-1, 1) 的 float32）
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._capacity = capacity
+        self._scale = scale
+        self._lock = threading.Lock()
+        # 有新数据写入时唤醒等待中的读者
+        self._data_ready = threading.Condition(self._lock)
+        # 累计写入的采样数（绝对位置）
+        self.position = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def write(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        if n == 0:
+            return
+
+        with self._lock:
+            cap = self._capacity
+            if n > cap:
+                # 新数据已经超过容量，只保留最新的部分
+                self.position += n - cap
+                samples = samples[-cap:]
+                n = cap
+
+            start = self.position % cap
+            first = min(n, cap - start)
+            self._store(self._buffer[start : start + first], samples[:first])
+            if first < n:
+                self._store(self._buffer[: n - first], samples[first:])
+            self.position += n
+            self._data_ready.notify_all()
+
+    def _store(self, out: np.ndarray, samples: np.ndarray) -> None:
+        if self._scale is None:
+            out[:] = samples
+        else:
+            np.multiply(samples, self._scale, out=out, casting="unsafe")
+
+    def create_reader(self) -> "RingReader":
+        return RingReader(self)
+
+    def _read(self, reader: "RingReader", n: Optional[int]) -> Optional[np.ndarray]:
+        with self._lock:
+            self._skip_overwritten(reader)
+            available = self.position - reader.cursor
+            if n is None:
+                n = available
+            if n > available:
+                return None
+            data = self._copy(reader.cursor, n)
+            reader.cursor += n
+            return data
+
+    def _read_into(self, reader: "RingReader", out: np.ndarray) -> bool:
+        with self._lock:
+            self._skip_overwritten(reader)
+            n = len(out)
+            if n > self.position - reader.cursor:
+                return False
+            start = reader.cursor % self._capacity
+            first = min(n, self._capacity - start)
+            out[:first] = self._buffer[start : start + first]
+            if first < n:
+                out[first:] = self._buffer[: n - first]
+            reader.cursor += n
+            return True
+
+    def _wait(self, reader: "RingReader", n: int, timeout: Optional[float]) -> bool:
+        with self._data_ready:
+            return self._data_ready.wait_for(
+                lambda: self.position - reader.cursor >= n, timeout
+            )
+
+    def _skip_overwritten(self, reader: "RingReader") -> None:
+        oldest = self.position - self._capacity
+        if reader.cursor < oldest:
+            reader.dropped += oldest - reader.cursor
+            reader.cursor = oldest
+
+    def _copy(self, cursor: int, n: int) -> np.ndarray:
+        start = cursor % self._capacity
+        end = start + n
+        if end <= self._capacity:
+            return self._buffer[start:end].copy()
+        return np.concatenate(
+            (self._buffer[start:], self._buffer[: end - self._capacity])
+        )
+
+
+class RingReader:
+    """BroadcastRingBuffer 的读者，只保存自己的读取位置"""
+
+    def __init__(self, ring: BroadcastRingBuffer):
+        self._ring = ring
+        self.cursor = ring.position
+        # 因读取过慢被覆盖的采样数
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return min(self._ring.position - self.cursor, self._ring.capacity)
+
+    def read(self, n: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        读取并消费 n 个采样
+
+        数据不足 n 个时返回 None（不消费任何数据），n 为空时读取全部数据
+        """
+        return self._ring._read(self, n)
+
+    def read_into(self, out: np.ndarray) -> bool:
+        """读取 len(out) 个采样到 out 中（不分配新数组），数据不足时返回 False"""
+        return self._ring._read_into(self, out)
+
+    def wait(self, n: int, timeout: Optional[float] = None) -> bool:
+        """阻塞直到至少有 n 个采样可读，超时返回 False"""
+        return self._ring._wait(self, n, timeout)
+
+    def seek_latest(self, keep: int = 0) -> None:
+        """主动跳过积压的数据（不计入 dropped），只保留最新的 keep 个采样"""
+        with self._ring._lock:
+            keep = min(keep, self._ring.capacity)
+            self.cursor = max(self.cursor, self._ring.position - keep)
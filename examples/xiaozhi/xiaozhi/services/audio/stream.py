@@ -5,12 +5,38 @@ import numpy as np
 
 from config import APP_CONFIG
 from xiaozhi.ref import get_xiaoai
+from xiaozhi.services.audio.agc import AGC
+from xiaozhi.services.audio.resample import Resampler
+from xiaozhi.services.audio.ring_buffer import BroadcastRingBuffer
+from xiaozhi.services.protocols.typing import AudioConfig
+
+# 输入流最多缓存的音频时长（秒），超出后丢弃最旧的数据
+MAX_INPUT_BUFFER_DURATION = 10
 
 
 class __GlobalStream:
     def __init__(self):
         self.readers = {}
         self.on_output_data = None
+        # 清空音箱播放缓冲的回调，返回一个完成时 done 的 Future
+        self.on_flush_output = None
+        # 下行音频的代数：打断后加一，之前代数的音频不再播放
+        self.output_generation = 0
+        # 采集总线写入新数据后的回调（在音频线程中调用，需要自行切换线程）
+        self.input_listeners: list[Callable[[], None]] = []
+        # 小爱音箱录音音量较小，需要后期放大一下
+        self.agc = AGC(sample_rate=AudioConfig.SAMPLE_RATE, **APP_CONFIG.get("agc", {}))
+        # 麦克风采集总线：每段输入只做一次增益处理，所有读者共享同一份数据
+        self.capture = BroadcastRingBuffer(
+            capacity=AudioConfig.SAMPLE_RATE * MAX_INPUT_BUFFER_DURATION,
+            dtype=np.int16,
+        )
+        # 同一份数据归一化后的 float32 版本（供 VAD 和 KWS 使用）
+        self.capture_float = BroadcastRingBuffer(
+            capacity=AudioConfig.SAMPLE_RATE * MAX_INPUT_BUFFER_DURATION,
+            dtype=np.float32,
+            scale=1 / 32768.0,
+        )
 
     def register_reader(self, reader):
         if reader.id not in self.readers:
@@ -21,12 +47,26 @@ class __GlobalStream:
             del self.readers[reader.id]
 
     def input(self, data: bytes) -> None:
-        for key in self.readers:
-            self.readers[key].input(data)
+        # 收到麦克风输入音频流
+        if not self.readers or len(data) == 0:
+            return
+
+        samples = self.agc.process(np.frombuffer(data, dtype=np.int16))
+        self.capture.write(samples)
+        self.capture_float.write(samples)
+        for listener in self.input_listeners:
+            listener()
 
     def output(self, frames: bytes) -> None:
         if self.on_output_data:
-            self.on_output_data(frames)
+            self.on_output_data(frames, self.output_generation)
+
+    def flush_output(self):
+        """丢弃所有还没播放的下行音频（包括音箱上已经缓冲的部分）"""
+        self.output_generation += 1
+        if self.on_flush_output:
+            return self.on_flush_output()
+        return None
 
 
 GlobalStream = __GlobalStream()
@@ -52,7 +92,18 @@ class MyStream:
         self._is_output = output
         self._is_active = False
 
-        self.input_bytes: list[int] = []
+        # 只保存自己在采集总线上的读取位置
+        capture = (
+            GlobalStream.capture_float
+            if format == AudioConfig.FLOAT_FORMAT
+            else GlobalStream.capture
+        )
+        self.input_reader = capture.create_reader()
+
+        # 输出采样率和音箱不一致时，先重采样再播放
+        self.resampler = None
+        if output and rate != AudioConfig.OUTPUT_SAMPLE_RATE:
+            self.resampler = Resampler(rate, AudioConfig.OUTPUT_SAMPLE_RATE)
 
         if start:
             self.start_stream()
@@ -67,6 +118,8 @@ class MyStream:
         if not self._is_active:
             self._is_active = True
             if self._is_input:
+                # 只读取开启之后的新数据
+                self.input_reader.seek_latest(0)
                 GlobalStream.register_reader(self)
 
     def stop_stream(self) -> None:
@@ -74,44 +127,54 @@ class MyStream:
             self._is_active = False
             if self._is_input:
                 GlobalStream.unregister_reader(self)
-                self.input_bytes.clear()
 
     def write(self, frames: bytes) -> None:
         # 发送输出音频流到扬声器
         if not self._is_output or not self._is_active:
             return
+        if self.resampler:
+            samples = np.frombuffer(frames, dtype=np.int16)
+            frames = self.resampler.process(samples).tobytes()
         GlobalStream.output(frames)
 
-    def input(self, data: bytes):
-        # 收到麦克风输入音频流
+    @property
+    def dropped_frames(self) -> int:
+        """因读取过慢而被覆盖的采样数"""
+        return self.input_reader.dropped
+
+    def get_read_available(self) -> int:
+        """可读取的帧数"""
+        return len(self.input_reader) // self._channels
+
+    def wait(self, num_frames: int, timeout: Optional[float] = None) -> bool:
+        """等待采集总线写入足够的帧，而不是轮询 read()"""
         if not self._is_input or not self._is_active:
-            return
+            return False
+        return self.input_reader.wait(num_frames * self._channels, timeout)
 
-        if len(data) > 0:
-            samples = np.frombuffer(data, dtype=np.int16)
-            # 小爱音箱录音音量较小，需要后期放大一下
-            samples = samples * APP_CONFIG["vad"]["boost"]
-            self.input_bytes.extend(samples.tobytes())
+    def skip(self, keep_frames: int = 0) -> None:
+        """丢弃积压的输入数据，只保留最新的 keep_frames 帧"""
+        self.input_reader.seek_latest(keep_frames * self._channels)
+
+    def read_into(self, out: np.ndarray) -> bool:
+        """读取 len(out) 个采样到预分配的数组中，数据不足时返回 False"""
+        if not self._is_input or not self._is_active:
+            return False
+        return self.input_reader.read_into(out)
 
     def read(self, num_frames=None, exception_on_overflow=False) -> bytes:
-        if num_frames is None:
-            data = bytes(self.input_bytes)
-            self.input_bytes.clear()
-            return data
-
-        num_frames = num_frames * 2
-        if (
-            not self._is_input
-            or not self._is_active
-            # 达不到预期长度时，返回空字节，等待下一次读取
-            or len(self.input_bytes) < num_frames
-        ):
+        if not self._is_input or not self._is_active:
             return bytes([])
 
-        data = bytes(self.input_bytes[:num_frames])
-        self.input_bytes = self.input_bytes[num_frames:]
+        if num_frames is None:
+            return self.input_reader.read().tobytes()
+
+        # 达不到预期长度时，返回空字节，等待下一次读取
+        data = self.input_reader.read(num_frames * self._channels)
+        if data is None:
+            return bytes([])
 
-        return data
+        return data.tobytes()
 
 
 class MyAudio:
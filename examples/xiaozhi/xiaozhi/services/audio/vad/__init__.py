@@ -1,10 +1,14 @@
 import threading
-import time
+
+import numpy as np
 
 from config import APP_CONFIG
 from xiaozhi.event import EventManager
 from xiaozhi.ref import set_vad
-from xiaozhi.services.audio.stream import MyAudio
+from xiaozhi.services.audio.ring_buffer import RingBuffer
+from xiaozhi.services.audio.stream import MyAudio, MyStream
+from xiaozhi.services.audio.vad.endpoint import Endpointer
+from xiaozhi.services.audio.vad.energy import EnergyGate
 from xiaozhi.services.audio.vad.silero import Silero
 from xiaozhi.services.protocols.typing import AudioConfig
 from xiaozhi.utils.base import get_env
@@ -22,9 +26,26 @@ class _VAD:
         self.threshold = config.get("threshold", 0.01)
         self.min_speech_duration = config.get("min_speech_duration", 250)
         self.min_silence_duration = config.get("min_silence_duration", 500)
+        self.max_speech_duration = config.get("max_speech_duration", 10000)
+        self.energy_gate = EnergyGate(margin=config.get("energy_gate", 6))
+        self.gated = False  # 上一次推理之后是否跳过过静音帧
+        # 预上传模式：检测到第一帧语音就开始上传，之后再确认是否真的在说话
+        self.speculative = config.get("speculative", False)
+        # 自适应断句（为空时使用固定的最小静默时长）
+        self.endpointer = None
+        adaptive_silence = config.get("adaptive_silence")
+        if adaptive_silence:
+            self.endpointer = Endpointer(
+                frame_duration=self.frame_size * 1000 / self.sample_rate,
+                threshold=self.threshold,
+                min_silence=adaptive_silence.get("min", 150),
+                base_silence=adaptive_silence.get("base", 300),
+                max_silence=adaptive_silence.get("max", 900),
+            )
 
         # 状态变量
         self.paused = True
+        self.resumed = threading.Event()  # 恢复检测时唤醒检测线程
         self.thread = None
         self.speech_count = 0
         self.silence_count = 0
@@ -32,17 +53,27 @@ class _VAD:
         self.audio = None
         self.stream = None
 
-        # 暂存的语音片段
-        self.silence_frames = []  # 静音片段
-        self.speech_frames = []  # 语音片段
-        self.target = None  # 检测目标 speech/silence
+        # 暂存的语音片段（归一化的 float32，超出容量时丢弃最旧的数据）
+        self.silence_frames = RingBuffer(
+            self.sample_rate, dtype=np.float32
+        )  # 静音片段（最近 1s）
+        self.speech_frames = RingBuffer(
+            self.sample_rate * self.max_speech_duration // 1000, dtype=np.float32
+        )  # 语音片段
+        # 当前帧（从采集总线直接读入，循环复用）
+        self.frame = np.zeros(self.frame_size, dtype=np.float32)
+        self.target = None  # 检测目标 speech/confirm/silence
+
+        # 延迟统计（采样数）
+        self.processed_samples = 0  # 已检测
+        self.max_lag_samples = 0  # 单次唤醒时积压的最大值
 
     def _reset_state(self):
         """重置状态"""
         self.speech_count = 0
         self.silence_count = 0
-        self.speech_frames = []
-        self.silence_frames = []
+        self.speech_frames.clear()
+        self.silence_frames.clear()
 
     def start(self):
         """启动VAD检测器"""
@@ -53,6 +84,7 @@ class _VAD:
 
         # 启动检测线程
         self.paused = False
+        self.resumed.set()
         self.thread = threading.Thread(target=self._detection_loop, daemon=True)
         self.thread.start()
 
@@ -62,6 +94,7 @@ class _VAD:
             return
 
         self.paused = True
+        self.resumed.clear()
         self._reset_state()
         self.stream.stop_stream()
 
@@ -70,53 +103,82 @@ class _VAD:
         if not get_env("CLI"):
             return
 
+        if self.endpointer and (
+            target == "speech" or self.target not in ["speech", "confirm"]
+        ):
+            # 新的一句话，重新统计
+            self.endpointer.reset()
+
         self.paused = False
         self.target = target
         self.stream.start_stream()
+        self.resumed.set()
+
+    def get_metrics(self) -> dict:
+        """检测延迟：等待检测的采样数与已检测的采样数"""
+        queued = self.stream.get_read_available() if self.stream else 0
+        return {
+            "queued_samples": queued,
+            "processed_samples": self.processed_samples,
+            "lag_ms": queued * 1000 / self.sample_rate,
+            "max_lag_ms": self.max_lag_samples * 1000 / self.sample_rate,
+            "skipped_ratio": self.energy_gate.skipped_ratio,
+        }
 
     def _handle_speech_frame(self, frames):
         """处理语音帧"""
-        self.speech_count += len(frames)
+        self.speech_count += len(frames) * 2  # 按 int16 字节数计数
         self.silence_count = 0
 
-        if self.target == "speech":
-            if not self.speech_frames:
-                # 加入静音片段（潜在的语音片段）
-                self.speech_frames.extend(self.silence_frames)
+        if self.target == "confirm":
+            # 预上传模式下，确认是真的在说话
+            if self.speech_count > self.min_speech_duration * self.sample_rate / 1000:
+                self.pause()
+                EventManager.on_speech(bytes([]))
+            return
 
-        # 加入语音片段
-        self.speech_frames.extend(frames)
+        if self.target != "speech":
+            return
 
-        speech_bytes = bytes(self.speech_frames)
+        if not self.speech_frames:
+            # 加入静音片段（潜在的语音片段）
+            self.speech_frames.write(self.silence_frames.read())
+
+        # 加入语音片段
+        self.speech_frames.write(frames)
 
         if (
-            self.target == "speech"
-            and self.speech_count > self.min_speech_duration * self.sample_rate / 1000
+            self.speculative
+            or self.speech_count > self.min_speech_duration * self.sample_rate / 1000
         ):
+            # 只在开始上传时拼接一次完整的语音片段（转回 int16 PCM）
+            speech = self.speech_frames.read() * 32768.0
+            speech_bytes = speech.astype(np.int16).tobytes()
             self.pause()
             EventManager.on_speech(speech_bytes)
 
     def _handle_silence_frame(self, frames):
         """处理静音帧"""
-        self.silence_count += len(frames)
+        self.silence_count += len(frames) * 2  # 按 int16 字节数计数
         self.speech_count = 0
 
         if self.target == "speech":
             if not self.speech_frames:
-                # 如果之前没有语音片段，则将当前帧加入静音片段
-                self.silence_frames.extend(frames)
-                # 确保静音片段长度不超过 1s
-                self.silence_frames = self.silence_frames[
-                    -1 * 1 * 2 * self.sample_rate :
-                ]
+                # 如果之前没有语音片段，则将当前帧加入静音片段（只保留最近 1s）
+                self.silence_frames.write(frames)
             else:
                 # 如果之前有语音片段，则将当前帧加入语音片段
-                self.speech_frames.extend(frames)
-
-        if (
-            self.target == "silence"
-            and self.silence_count > self.min_silence_duration * self.sample_rate / 1000
-        ):
+                self.speech_frames.write(frames)
+
+        if self.target == "silence" and self.endpointer:
+            is_end = self.endpointer.is_endpoint()
+        else:
+            is_end = (
+                self.target in ["silence", "confirm"]
+                and self.silence_count
+                > self.min_silence_duration * self.sample_rate / 1000
+            )
+        if is_end:
             self.pause()
             EventManager.on_silence()
 
@@ -127,7 +189,7 @@ class _VAD:
             self.audio = MyAudio.create()
             # 创建输入流
             self.stream = self.audio.open(
-                format=AudioConfig.FORMAT,
+                format=AudioConfig.FLOAT_FORMAT,
                 channels=1,
                 rate=self.sample_rate,
                 input=True,
@@ -153,29 +215,55 @@ class _VAD:
         except Exception:
             pass
 
+    def _read_frame(self):
+        """读取一帧归一化的 float32 音频，数据不足时返回 None"""
+        if isinstance(self.stream, MyStream):
+            return self.frame if self.stream.read_into(self.frame) else None
+        frames = self.stream.read(self.frame_size, exception_on_overflow=False)
+        return np.frombuffer(frames, dtype=np.float32)
+
     def _detection_loop(self):
         """VAD检测主循环"""
         while True:
-            # 如果暂停或者音频流未初始化，则跳过
+            # 如果暂停或者音频流未初始化，则等待恢复
             if self.paused or not self.stream:
-                time.sleep(0.1)
+                self.resumed.wait()
                 continue
 
-            # 读取缓冲区音频数据
-            frames = self.stream.read(self.frame_size)
-            if len(frames) != self.frame_size * 2:
-                time.sleep(0.01)
+            # 等待采集总线写入一个完整的帧（PyAudio 的 read 本身是阻塞的）
+            if isinstance(self.stream, MyStream) and not self.stream.wait(
+                self.frame_size, timeout=0.1
+            ):
                 continue
 
-            # 检测是否是语音
-            speech_prob = Silero.vad(frames, self.sample_rate) or 0
-            is_speech = speech_prob >= self.threshold
-            if is_speech:
-                self._handle_speech_frame(frames)
-            else:
-                self._handle_silence_frame(frames)
+            self.max_lag_samples = max(
+                self.max_lag_samples, self.stream.get_read_available()
+            )
 
-            time.sleep(0.01)
+            # 一次性处理所有已就绪的完整帧
+            while not self.paused:
+                frames = self._read_frame()
+                if frames is None:
+                    break
+                self.processed_samples += self.frame_size
+
+                # 检测是否是语音（能量明显高于噪声底时才运行 Silero）
+                speech_prob = 0
+                if self.energy_gate.should_infer(frames):
+                    if self.gated:
+                        # 中间跳过的帧没有送入模型，之前的状态和 context 已经过时
+                        Silero.reset(self.sample_rate)
+                        self.gated = False
+                    speech_prob = Silero.vad(frames, self.sample_rate) or 0
+                else:
+                    self.gated = True
+                is_speech = speech_prob >= self.threshold
+                if self.endpointer:
+                    self.endpointer.update(speech_prob, is_speech)
+                if is_speech:
+                    self._handle_speech_frame(frames)
+                else:
+                    self._handle_silence_frame(frames)
 
 
 VAD = _VAD()
@@ -0,0 +1,83 @@
+from collections import deque
+
+
+class Endpointer:
+    """
+    自适应断句
+
+    根据已说话的时长、句中停顿的长短（语速）以及 VAD 置信度的变化趋势，
+    动态调整判定说话结束所需的静默时长：
+    - 短指令用较短的静默时长，长句子允许更长的停顿
+    - 句中停顿越长（说话慢），静默时长越长
+    - 语音概率已经明显回落、且静默段的概率很低时，提前结束
+    """
+
+    def __init__(
+        self,
+        frame_duration: float = 32,
+        threshold: float = 0.1,
+        min_silence: float = 150,
+        base_silence: float = 300,
+        max_silence: float = 900,
+    ):
+        """
+        参数:
+            frame_duration: 每帧时长（ms）
+            threshold: 语音检测阈值
+            min_silence/base_silence/max_silence: 静默时长的下限/基准值/上限（ms）
+        """
+        self.frame_duration = frame_duration
+        self.threshold = threshold
+        self.min_silence = min_silence
+        self.base_silence = base_silence
+        self.max_silence = max_silence
+        self.reset()
+
+    def reset(self):
+        self.speech_ms = 0  # 已说话时长
+        self.silence_ms = 0  # 当前静默时长
+        self.pauses = deque(maxlen=5)  # 最近几次句中停顿的时长
+        self.speech_probs = deque(maxlen=8)  # 最近几帧语音的概率
+        self.silence_prob_sum = 0.0  # 当前静默段的概率之和
+
+    def update(self, prob: float, is_speech: bool):
+        """送入一帧的检测结果"""
+        if is_speech:
+            if self.speech_ms and self.silence_ms:
+                # 一次句中停顿结束
+                self.pauses.append(self.silence_ms)
+            self.speech_ms += self.frame_duration
+            self.silence_ms = 0
+            self.silence_prob_sum = 0.0
+            self.speech_probs.append(prob)
+        else:
+            self.silence_ms += self.frame_duration
+            self.silence_prob_sum += prob
+
+    @property
+    def required_silence(self) -> float:
+        """当前判定说话结束所需的静默时长（ms）"""
+        if not self.speech_ms:
+            return self.base_silence
+
+        # 说话越久，允许的停顿越长
+        window = self.base_silence * min(max(0.6 + self.speech_ms / 5000, 0.6), 1.5)
+
+        # 说话慢（句中停顿长）时，至少等过平均停顿时长
+        if self.pauses:
+            window = max(window, 1.2 * sum(self.pauses) / len(self.pauses))
+
+        # 语音概率在回落，且静默段的概率远低于阈值时，提前结束
+        if self.silence_ms and len(self.speech_probs) > 1:
+            mean_speech = sum(self.speech_probs) / len(self.speech_probs)
+            falling = self.speech_probs[-1] < mean_speech
+            frames = self.silence_ms / self.frame_duration
+            confident = self.silence_prob_sum / frames < 0.2 * self.threshold
+            if falling and confident:
+                window *= 0.6
+
+        return min(max(window, self.min_silence), self.max_silence)
+
+    def is_endpoint(self) -> bool:
+        """是否已经可以判定说话结束"""
+        return self.silence_ms >= self.required_silence
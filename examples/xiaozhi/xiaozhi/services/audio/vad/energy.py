@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class EnergyGate:
+    """
+    能量预筛选
+
+    跟踪环境噪声底（dBFS），只有当帧能量明显高于噪声底时才需要运行 Silero，
+    其余帧直接当作静音处理，避免在安静环境下持续推理
+    """
+
+    def __init__(
+        self,
+        margin: float = 6.0,
+        rise: float = 0.02,
+        fall: float = 0.5,
+        hangover: int = 8,
+    ):
+        """
+        参数:
+            margin: 帧能量高于噪声底多少 dB 时运行语音检测（<= 0 时关闭预筛选）
+            rise: 噪声底上升的平滑系数（噪声变大时缓慢跟随）
+            fall: 噪声底下降的平滑系数（噪声变小时快速跟随）
+            hangover: 能量回落后继续运行语音检测的帧数，避免截断语音尾音
+        """
+        self.margin = margin
+        self.rise = rise
+        self.fall = fall
+        self.hangover = hangover
+
+        self.noise_floor = None  # dBFS
+        self.hangover_count = 0
+        self.total_frames = 0
+        self.skipped_frames = 0
+
+    @property
+    def skipped_ratio(self) -> float:
+        """跳过推理的帧占比"""
+        return self.skipped_frames / self.total_frames if self.total_frames else 0.0
+
+    @staticmethod
+    def energy(samples: np.ndarray) -> float:
+        """帧能量（dBFS），samples 为归一化的 float32 或 int16 音频"""
+        x = samples
+        if x.dtype == np.int16:
+            x = x.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.dot(x, x) / max(len(x), 1))
+        return 20 * np.log10(rms + 1e-9)
+
+    def should_infer(self, samples: np.ndarray) -> bool:
+        """是否需要对当前帧运行语音检测"""
+        self.total_frames += 1
+        if self.margin <= 0:
+            return True
+
+        energy = self.energy(samples)
+        if self.noise_floor is None:
+            self.noise_floor = energy
+            return True
+
+        if energy > self.noise_floor + self.margin:
+            self.hangover_count = self.hangover
+            # 有声音时噪声底只缓慢上升，避免被持续的语音抬高
+            self.noise_floor += self.rise * 0.1 * (energy - self.noise_floor)
+            return True
+
+        if energy < self.noise_floor:
+            self.noise_floor += self.fall * (energy - self.noise_floor)
+        else:
+            self.noise_floor += self.rise * (energy - self.noise_floor)
+
+        if self.hangover_count > 0:
+            self.hangover_count -= 1
+            return True
+
+        self.skipped_frames += 1
+        return False
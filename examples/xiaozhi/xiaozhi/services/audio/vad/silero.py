@@ -1,3 +1,7 @@
+import threading
+from collections import deque
+from typing import Hashable
+
 import numpy as np
 import onnxruntime as ort
 
@@ -84,19 +88,199 @@ class OnnxWrapper:
         return out
 
 
+class SileroStream:
+    """
+    单路流式检测的快速路径
+
+    输入（context + 当前帧）、状态和输出张量都是预分配的，通过 IO binding
+    直接绑定到 ONNX Runtime，每帧只做一次原地类型转换，不再分配新的数组
+    """
+
+    def __init__(self, session: ort.InferenceSession, sample_rate: int = 16000):
+        # 只在创建时校验一次参数
+        if sample_rate not in [8000, 16000]:
+            raise ValueError("Supported sampling rates: [8000, 16000]")
+        self.session = session
+        self.sample_rate = sample_rate
+        self.num_samples = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+
+        self._input = np.zeros(
+            (1, self.context_size + self.num_samples), dtype=np.float32
+        )
+        self._context = self._input[0, : self.context_size]
+        self._tail = self._input[0, -self.context_size :]
+        self._samples = self._input[0, self.context_size :]
+        self._output = np.zeros((1, 1), dtype=np.float32)
+        # 状态张量轮流作为输入和输出
+        self._states = [np.zeros((2, 1, 128), dtype=np.float32) for _ in range(2)]
+
+        x = ort.OrtValue.ortvalue_from_numpy(self._input)
+        sr = ort.OrtValue.ortvalue_from_numpy(np.array(sample_rate, dtype=np.int64))
+        out = ort.OrtValue.ortvalue_from_numpy(self._output)
+        states = [ort.OrtValue.ortvalue_from_numpy(state) for state in self._states]
+        output_name, state_name = [o.name for o in session.get_outputs()]
+
+        self._bindings = []
+        for i in range(2):
+            binding = session.io_binding()
+            binding.bind_ortvalue_input("input", x)
+            binding.bind_ortvalue_input("state", states[i])
+            binding.bind_ortvalue_input("sr", sr)
+            binding.bind_ortvalue_output(output_name, out)
+            binding.bind_ortvalue_output(state_name, states[1 - i])
+            self._bindings.append(binding)
+        self._current = 0
+
+    def reset(self):
+        self._input.fill(0)
+        for state in self._states:
+            state.fill(0)
+
+    def __call__(self, samples: np.ndarray) -> float:
+        """检测一帧音频（int16 或已归一化的 float32），返回语音概率"""
+        # 上一帧的末尾作为这一帧的 context
+        self._context[:] = self._tail
+        if samples.dtype == np.int16:
+            np.multiply(samples, 1 / 32768.0, out=self._samples, casting="unsafe")
+        else:
+            self._samples[:] = samples
+        self.session.run_with_iobinding(self._bindings[self._current])
+        self._current ^= 1
+        return float(self._output[0, 0])
+
+
+class SileroBatch:
+    """
+    多路音频流共用一个 Silero 模型
+
+    每一路音频流在 _state/_context 中占用一行，每个 tick 把所有已就绪的帧
+    拼成一个批次，只调用一次 session.run
+    """
+
+    def __init__(self, session: ort.InferenceSession, sample_rate: int = 16000):
+        if sample_rate not in [8000, 16000]:
+            raise ValueError("Supported sampling rates: [8000, 16000]")
+        self.session = session
+        self.sample_rate = sample_rate
+        self.num_samples = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+
+        self._lock = threading.Lock()
+        self._keys: list[Hashable] = []  # 第 i 行对应的音频流
+        self._slots: dict[Hashable, int] = {}
+        self._pending: dict[Hashable, deque] = {}
+        self._state = np.zeros((2, 0, 128), dtype=np.float32)
+        self._context = np.zeros((0, self.context_size), dtype=np.float32)
+        self._sr = np.array(sample_rate, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add_stream(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._slots:
+                return
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._pending[key] = deque()
+            self._state = np.concatenate(
+                [self._state, np.zeros((2, 1, 128), dtype=np.float32)], axis=1
+            )
+            self._context = np.concatenate(
+                [self._context, np.zeros((1, self.context_size), dtype=np.float32)]
+            )
+
+    def remove_stream(self, key: Hashable) -> None:
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                return
+            del self._pending[key]
+            # 用最后一行填补空位，保持数组紧凑
+            last = len(self._keys) - 1
+            if slot != last:
+                last_key = self._keys[last]
+                self._keys[slot] = last_key
+                self._slots[last_key] = slot
+                self._state[:, slot] = self._state[:, last]
+                self._context[slot] = self._context[last]
+            self._keys.pop()
+            self._state = self._state[:, :last].copy()
+            self._context = self._context[:last].copy()
+
+    def reset_stream(self, key: Hashable) -> None:
+        with self._lock:
+            slot = self._slots[key]
+            self._state[:, slot] = 0
+            self._context[slot] = 0
+            self._pending[key].clear()
+
+    def submit(self, key: Hashable, frames: bytes) -> None:
+        """提交一帧 int16 音频，等待下一个 tick 统一推理"""
+        samples = np.frombuffer(frames, dtype=np.int16)
+        if len(samples) != self.num_samples:
+            raise ValueError(
+                f"Provided number of samples is {len(samples)} (Supported values: {self.num_samples})"
+            )
+        with self._lock:
+            self._pending[key].append(samples)
+
+    def tick(self) -> dict[Hashable, float]:
+        """对每路音频流最早提交的一帧做一次批量推理，返回各自的语音概率"""
+        with self._lock:
+            keys = [key for key in self._keys if self._pending[key]]
+            if not keys:
+                return {}
+
+            slots = np.array([self._slots[key] for key in keys])
+            x = np.empty(
+                (len(keys), self.context_size + self.num_samples), dtype=np.float32
+            )
+            x[:, : self.context_size] = self._context[slots]
+            for i, key in enumerate(keys):
+                x[i, self.context_size :] = self._pending[key].popleft()
+            x[:, self.context_size :] /= 32768.0
+
+            out, state = self.session.run(
+                None,
+                {"input": x, "state": self._state[:, slots], "sr": self._sr},
+            )
+            self._state[:, slots] = state
+            self._context[slots] = x[:, -self.context_size :]
+
+        return {key: float(out[i, 0]) for i, key in enumerate(keys)}
+
+
 class _Silero:
     def __init__(self) -> None:
         self.model = OnnxWrapper(
             path=get_model_file_path("silero_vad.onnx"),
         )
+        self.streams: dict[int, SileroStream] = {}
 
     def vad(self, frames, sample_rate):
+        """frames: int16 PCM 字节，或归一化的 float32 数组"""
         try:
-            audio_int16 = np.frombuffer(frames, dtype=np.int16)
-            audio_float32 = audio_int16.astype(np.float32) / 32768.0
-            return self.model(audio_float32, sample_rate).item()
+            stream = self.streams.get(sample_rate)
+            if stream is None:
+                stream = SileroStream(self.model.session, sample_rate)
+                self.streams[sample_rate] = stream
+            if not isinstance(frames, np.ndarray):
+                frames = np.frombuffer(frames, dtype=np.int16)
+            return stream(frames)
         except Exception:
             return None
 
+    def reset(self, sample_rate):
+        """清空单路检测的状态和 context（之后的帧按新的一段音频检测）"""
+        stream = self.streams.get(sample_rate)
+        if stream is not None:
+            stream.reset()
+
+    def create_batch(self, sample_rate=16000) -> SileroBatch:
+        """创建多路批量推理引擎（与单路检测共用同一个模型）"""
+        return SileroBatch(self.model.session, sample_rate)
+
 
 Silero = _Silero()
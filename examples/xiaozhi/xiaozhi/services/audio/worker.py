@@ -0,0 +1,86 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+
+class StageStats:
+    """单个处理阶段的耗时统计"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0,
+            "max_ms": self.max * 1000,
+        }
+
+
+class CodecWorker:
+    """
+    编解码工作线程
+
+    Opus 编解码等 CPU 密集的任务放到独立的线程（多路会话时可以是多个线程）里执行，
+    事件循环只负责网络收发。任务队列有上限，处理不过来时直接丢弃新任务。
+    调用方提交任务后不等待，在 Future 的回调里接收结果（上行编码结果交给协议的上行队列）；
+    只有一个线程时任务按提交顺序完成
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 8):
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.stats: dict[str, StageStats] = defaultdict(StageStats)
+        self.dropped = 0  # 队列已满被丢弃的任务数
+
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._work_loop, name=f"codec-{i}", daemon=True
+            )
+            thread.start()
+
+    def timed(self, stage: str, fn, *args):
+        """在当前线程执行并记录耗时"""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.stats[stage].add(time.perf_counter() - start)
+
+    def submit(self, stage: str, fn, *args):
+        """提交任务，返回 Future（队列已满时返回 None）"""
+        future = Future()
+        try:
+            self.jobs.put_nowait((stage, fn, args, future, time.perf_counter()))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return future
+
+    def _work_loop(self):
+        while True:
+            stage, fn, args, future, submitted = self.jobs.get()
+            self.stats["queue"].add(time.perf_counter() - submitted)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.timed(stage, fn, *args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def get_metrics(self) -> dict:
+        return {
+            "pending": self.jobs.qsize(),
+            "dropped": self.dropped,
+            **{stage: stats.to_dict() for stage, stats in list(self.stats.items())},
+        }
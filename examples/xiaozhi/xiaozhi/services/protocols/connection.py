@@ -0,0 +1,133 @@
+import asyncio
+import random
+import time
+
+from config import APP_CONFIG
+from xiaozhi.ref import get_xiaozhi
+from xiaozhi.services.protocols.protocol import Protocol
+from xiaozhi.services.protocols.typing import DeviceState
+
+
+class ConnectionManager:
+    """
+    连接管理
+
+    在后台保持一条经过验证的可用连接：
+    - 空闲时定期验证连接（心跳），验证失败立即重连
+    - 重连失败后按带随机抖动的指数退避重试
+    - 检测到唤醒时调用 warm_up，立即验证/重连，和唤醒提示语并行完成握手
+    - 后台重连失败只记录下来，不通知应用、不改变设备状态（说话过程中断线时继续录音，
+      重连后补发），需要连接的地方用 ensure_connected 的返回值判断
+    """
+
+    def __init__(self, protocol: Protocol):
+        config = APP_CONFIG.get("connection", {})
+        self.protocol = protocol
+        self.check_interval = config.get("check_interval", 1)
+        self.backoff_base = config.get("backoff_base", 0.5)
+        self.backoff_max = config.get("backoff_max", 30)
+
+        self.loop = None
+        self.task = None
+        self.ready = None  # 连接可用时 set
+        self.wake = None  # 需要立即检查连接时 set
+        self.attempt = 0  # 连续重连失败的次数
+
+        # 统计
+        self.connects = 0
+        self.failures = 0
+        self.warm_ups = 0
+        self.last_connect_ms = 0
+        self.last_error = None
+
+    async def start(self):
+        """建立连接并启动后台检查任务"""
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+        self.wake = asyncio.Event()
+        # 连接失败由连接管理自己处理（按退避重试）
+        self.protocol.on_network_error = self._on_network_error
+        self.task = asyncio.create_task(self._run())
+
+    def _on_network_error(self, message: str):
+        if self.last_error is None:
+            print(f"❌ 连接失败: {message}")
+        self.last_error = message
+
+    def warm_up(self):
+        """立即检查连接，必要时马上重连（可以在任意线程调用）"""
+        if self.loop:
+            self.warm_ups += 1
+            self.attempt = 0
+            self.loop.call_soon_threadsafe(self.wake.set)
+
+    async def ensure_connected(self, timeout: float = 10) -> bool:
+        """等待连接可用"""
+        if self.protocol.is_audio_channel_opened():
+            return True
+        self.ready.clear()
+        self.warm_up()
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.protocol.is_audio_channel_opened()
+
+    def _backoff(self) -> float:
+        """带随机抖动的指数退避（full jitter）"""
+        limit = min(self.backoff_max, self.backoff_base * 2**self.attempt)
+        return random.uniform(self.backoff_base, max(limit, self.backoff_base))
+
+    async def _check(self) -> bool:
+        if not self.protocol.is_audio_channel_opened():
+            return False
+        # 只在空闲时验证，对话过程中不打扰
+        if get_xiaozhi().device_state != DeviceState.IDLE:
+            return True
+        return await self.protocol.validate()
+
+    async def _connect(self) -> bool:
+        start = time.perf_counter()
+        connected = await self.protocol.connect()
+        if connected:
+            self.connects += 1
+            self.last_connect_ms = (time.perf_counter() - start) * 1000
+            self.last_error = None
+        else:
+            self.failures += 1
+        return connected
+
+    async def _run(self):
+        while True:
+            # 先清掉唤醒标记：检查/重连期间收到的 warm_up 会让下一轮立即开始
+            self.wake.clear()
+            delay = self.check_interval
+            try:
+                connected = await self._check() or await self._connect()
+            except Exception as e:
+                self.failures += 1
+                self._on_network_error(f"连接检查异常: {str(e)}")
+                connected = False
+
+            if connected:
+                self.attempt = 0
+                self.ready.set()
+            else:
+                self.ready.clear()
+                delay = self._backoff()
+                self.attempt += 1
+
+            try:
+                await asyncio.wait_for(self.wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_metrics(self) -> dict:
+        return {
+            "connected": self.protocol.is_audio_channel_opened(),
+            "connects": self.connects,
+            "failures": self.failures,
+            "warm_ups": self.warm_ups,
+            "last_connect_ms": self.last_connect_ms,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,228 @@
+import asyncio
+import json
+
+from xiaozhi.services.protocols.protocol import Protocol
+from xiaozhi.utils.config import ConfigManager
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    """UDP 音频通道"""
+
+    def __init__(self, protocol: "MqttProtocol"):
+        self.protocol = protocol
+
+    def datagram_received(self, data: bytes, addr):
+        self.protocol._on_udp_packet(data)
+
+    def error_received(self, exc):
+        pass
+
+
+class MqttProtocol(Protocol):
+    """
+    MQTT + UDP 协议
+
+    控制消息（hello/listen/tts 等 JSON）走 MQTT，音频走 UDP：
+    每个 UDP 包前 16 字节为 nonce（类型、长度、会话标识、序号），
+    后面是用 hello 消息下发的 key 和 nonce 做 AES-CTR 加密的 Opus 数据。
+    丢包、乱序交给下行的抖动缓冲处理，不会像 TCP 那样因为重传阻塞后面的音频
+
+    需要安装可选依赖：uv sync --extra mqtt
+    """
+
+    def __init__(self):
+        super().__init__()
+        # 获取配置管理器实例
+        self.config = ConfigManager.instance()
+        self.mqtt_client = None
+        self.mqtt_connected = None  # 在连接时创建 Event
+        self.hello_received = None
+        self.loop = None
+        self.connected = False
+
+        # UDP 音频通道参数（由服务端 hello 消息下发）
+        self.udp_transport = None
+        self.udp_server = None
+        self.udp_port = None
+        self.udp_key = None
+        self.udp_nonce = None
+        self.local_sequence = 0
+
+    async def connect(self) -> bool:
+        """连接 MQTT 服务器，并通过 hello 消息建立 UDP 音频通道"""
+        try:
+            self.loop = asyncio.get_running_loop()
+            self.hello_received = asyncio.Event()
+
+            if self.mqtt_client is None:
+                self.mqtt_connected = asyncio.Event()
+                self._connect_mqtt()
+            await asyncio.wait_for(self.mqtt_connected.wait(), timeout=10.0)
+
+            # 发送客户端hello消息
+            hello_message = self.get_hello_message("udp")
+            await self.send_text(json.dumps(hello_message))
+
+            # 等待服务器hello响应
+            try:
+                await asyncio.wait_for(self.hello_received.wait(), timeout=10.0)
+            except asyncio.TimeoutError:
+                if self.on_network_error:
+                    self.on_network_error("等待响应超时")
+                return False
+
+            await self._open_udp()
+            self.connected = True
+
+            # 通知音频通道已打开
+            if self.on_audio_channel_opened:
+                await self.on_audio_channel_opened()
+            return True
+        except Exception as e:
+            if self.on_network_error:
+                self.on_network_error(f"无法连接服务: {str(e)}")
+            return False
+
+    def _connect_mqtt(self):
+        import paho.mqtt.client as mqtt
+
+        mqtt_info = self.config.get_config("MQTT_INFO") or {}
+        host, _, port = mqtt_info["endpoint"].partition(":")
+        port = int(port or 8883)
+
+        self.mqtt_client = mqtt.Client(
+            callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+            client_id=mqtt_info["client_id"],
+        )
+        self.mqtt_client.username_pw_set(
+            mqtt_info.get("username"), mqtt_info.get("password")
+        )
+        if port == 8883:
+            self.mqtt_client.tls_set()
+        self.publish_topic = mqtt_info["publish_topic"]
+        self.subscribe_topic = mqtt_info.get("subscribe_topic")
+
+        self.mqtt_client.on_connect = self._on_mqtt_connect
+        self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
+        self.mqtt_client.on_message = self._on_mqtt_message
+        self.mqtt_client.connect_async(host, port, keepalive=90)
+        # paho 在自己的线程里收发消息（断线后自动重连），回调再转到事件循环上处理
+        self.mqtt_client.loop_start()
+
+    def _on_mqtt_connect(self, client, userdata, flags, reason_code, properties):
+        if reason_code.is_failure:
+            return
+        if self.subscribe_topic and self.subscribe_topic != "null":
+            client.subscribe(self.subscribe_topic)
+        self.loop.call_soon_threadsafe(self.mqtt_connected.set)
+
+    def _on_mqtt_disconnect(self, client, userdata, flags, reason_code, properties):
+        self.loop.call_soon_threadsafe(self.mqtt_connected.clear)
+        asyncio.run_coroutine_threadsafe(self._close_udp(), self.loop)
+
+    def _on_mqtt_message(self, client, userdata, message):
+        try:
+            data = json.loads(message.payload)
+        except json.JSONDecodeError:
+            return
+        self.loop.call_soon_threadsafe(self._handle_json, data)
+
+    def _handle_json(self, data: dict):
+        """处理 MQTT 收到的 JSON 消息（在事件循环上运行）"""
+        msg_type = data.get("type")
+        if msg_type == "hello":
+            self._handle_server_hello(data)
+        elif msg_type == "goodbye":
+            # 服务端结束了本次会话
+            if data.get("session_id") in [None, self.session_id]:
+                self.loop.create_task(self._close_udp())
+        elif self.on_incoming_json:
+            self.on_incoming_json(data)
+
+    def _handle_server_hello(self, data: dict):
+        """处理服务器的 hello 消息，保存 UDP 音频通道参数"""
+        transport = data.get("transport")
+        udp = data.get("udp")
+        if transport != "udp" or not udp:
+            return
+
+        self.session_id = data.get("session_id", "")
+        self.udp_server = udp["server"]
+        self.udp_port = udp["port"]
+        self.udp_key = bytes.fromhex(udp["key"])
+        self.udp_nonce = bytes.fromhex(udp["nonce"])
+        self.update_audio_params(data.get("audio_params"))
+        self.hello_received.set()
+
+    async def _open_udp(self):
+        await self._close_udp(notify=False)
+        self.local_sequence = 0
+        self.udp_transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _UdpProtocol(self),
+            remote_addr=(self.udp_server, self.udp_port),
+        )
+
+    async def _close_udp(self, notify=True):
+        was_connected = self.connected
+        self.connected = False
+        if self.udp_transport:
+            self.udp_transport.close()
+            self.udp_transport = None
+        if notify and was_connected and self.on_audio_channel_closed:
+            await self.on_audio_channel_closed()
+
+    def _crypt(self, nonce: bytes, data: bytes) -> bytes:
+        """AES-CTR 加密/解密（两者是同一个运算）"""
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        cipher = Cipher(algorithms.AES(self.udp_key), modes.CTR(nonce))
+        encryptor = cipher.encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+    def _on_udp_packet(self, data: bytes):
+        """收到 UDP 音频包"""
+        if len(data) <= 16 or not self.on_incoming_audio:
+            return
+        nonce = data[:16]
+        sequence = int.from_bytes(nonce[12:16], "big")
+        self.on_incoming_audio(self._crypt(nonce, data[16:]), sequence)
+
+    async def send_audio_frame(self, frame: bytes):
+        """加密并发送一帧音频数据"""
+        self.local_sequence += 1
+        nonce = (
+            self.udp_nonce[:2]
+            + len(frame).to_bytes(2, "big")
+            + self.udp_nonce[4:12]
+            + self.local_sequence.to_bytes(4, "big")
+        )
+        self.udp_transport.sendto(nonce + self._crypt(nonce, frame))
+
+    def get_write_buffer_size(self) -> int:
+        if self.udp_transport:
+            return self.udp_transport.get_write_buffer_size()
+        return 0
+
+    async def send_text(self, message: str):
+        """发送文本消息"""
+        if self.mqtt_client:
+            self.mqtt_client.publish(self.publish_topic, message)
+
+    def is_audio_channel_opened(self) -> bool:
+        """检查音频通道是否打开"""
+        return self.udp_transport is not None and self.connected
+
+    async def open_audio_channel(self):
+        await self.connect()
+
+    async def close_audio_channel(self):
+        """关闭音频通道"""
+        if self.is_audio_channel_opened():
+            await self.send_text(
+                json.dumps({"session_id": self.session_id, "type": "goodbye"})
+            )
+        await self._close_udp()
+
+    async def validate(self) -> bool:
+        """MQTT 连接和 UDP 音频通道都可用（MQTT 本身的心跳由 paho 负责）"""
+        return self.mqtt_connected.is_set() and self.is_audio_channel_opened()
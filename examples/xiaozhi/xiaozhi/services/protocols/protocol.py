@@ -1,6 +1,12 @@
+import asyncio
+import itertools
 import json
+import time
+from collections import deque
 
-from xiaozhi.services.protocols.typing import ListeningMode
+from config import APP_CONFIG
+from xiaozhi.services.audio.worker import StageStats
+from xiaozhi.services.protocols.typing import AudioConfig, ListeningMode
 
 
 class Protocol:
@@ -12,6 +18,38 @@ class Protocol:
         self.on_audio_channel_closed = None
         self.on_network_error = None
 
+        # 下行音频参数（由服务端 hello 消息协商）
+        self.server_sample_rate = 24000
+        self.server_frame_duration = 60
+        self.server_frame_size = int(
+            self.server_sample_rate * (self.server_frame_duration / 1000)
+        )
+
+        # 上行音频：由单个发送任务从有界队列里取出，连续发送
+        config = APP_CONFIG.get("uplink", {})
+        self.uplink_max_queue = config.get("max_queue", 50)
+        self.uplink_high_water = config.get("high_water", 16384)
+        self.uplink_congested_queue = config.get("congested_queue", 5)
+        self.uplink_queue = None
+        self.uplink_task = None
+        self.uplink_latency = StageStats()  # 入队到发送完成的耗时
+        self.uplink_max_depth = 0
+        self.uplink_dropped = {
+            "overflow": 0,
+            "congested": 0,
+            "closed": 0,
+            "expired": 0,
+            "error": 0,
+        }
+
+        # 本次说话的录音帧 [编号, 录制时间, 数据, 是否已发送]，只保留最近 replay_max_age 内的帧。
+        # 断线期间暂停发送，重连后把本次说话的录音补发给新的会话
+        self.uplink_replay_max_age = config.get("replay_max_age", 5000) / 1000
+        self.uplink_backlog = deque()
+        self.uplink_hold = False
+        self.uplink_replayed = 0
+        self._uplink_index = itertools.count()
+
     def on_incoming_json(self, callback):
         """设置JSON消息接收回调函数"""
         self.on_incoming_json = callback
@@ -32,6 +70,155 @@ class Protocol:
         """设置网络错误回调函数"""
         self.on_network_error = callback
 
+    def update_audio_params(self, audio_params: dict):
+        """使用服务端 hello 消息里的音频参数"""
+        if not audio_params:
+            return
+        # 获取服务器的采样率
+        sample_rate = audio_params.get("sample_rate")
+        if sample_rate:
+            self.server_sample_rate = sample_rate
+        frame_duration = audio_params.get("frame_duration")
+        if frame_duration:
+            self.server_frame_duration = frame_duration
+        self.server_frame_size = int(
+            self.server_sample_rate * (self.server_frame_duration / 1000)
+        )
+
+    def get_hello_message(self, transport: str) -> dict:
+        """客户端 hello 消息"""
+        return {
+            "type": "hello",
+            "version": 1,
+            "transport": transport,
+            "audio_params": {
+                "format": "opus",
+                "sample_rate": AudioConfig.SAMPLE_RATE,
+                "channels": AudioConfig.CHANNELS,
+                "frame_duration": AudioConfig.FRAME_DURATION,
+            },
+        }
+
+    async def send_audio(self, frames: list[bytes]):
+        """发送音频数据（放入上行队列，由发送任务依次发送）"""
+        if self.uplink_queue is None:
+            self.uplink_queue = asyncio.Queue()
+        if self.uplink_task is None or self.uplink_task.done():
+            self.uplink_task = asyncio.create_task(self._uplink_loop())
+
+        now = time.perf_counter()
+        for frame in frames:
+            if self.uplink_queue.qsize() >= self.uplink_max_queue:
+                # 队列已满，丢弃最旧的帧
+                self.uplink_queue.get_nowait()
+                self.uplink_dropped["overflow"] += 1
+            self.uplink_queue.put_nowait((frame, now))
+        self.uplink_max_depth = max(self.uplink_max_depth, self.uplink_queue.qsize())
+
+    async def _uplink_loop(self):
+        """上行发送任务"""
+        while True:
+            frame, queued_at = await self.uplink_queue.get()
+            entry = self._append_backlog(frame, queued_at)
+            if self.uplink_hold or not self.is_audio_channel_opened():
+                # 断线了，先缓存起来等重连
+                self.uplink_hold = True
+                continue
+
+            # 发送缓冲区积压过多时，只保留最新的几帧，避免延迟越积越大
+            if (
+                self.get_write_buffer_size() > self.uplink_high_water
+                and self.uplink_queue.qsize() >= self.uplink_congested_queue
+            ):
+                self.uplink_dropped["congested"] += 1
+                continue
+
+            try:
+                await self.send_audio_frame(frame)
+                entry[3] = True
+                self.uplink_latency.add(time.perf_counter() - queued_at)
+            except Exception:
+                self.uplink_dropped["error"] += 1
+                self.uplink_hold = True
+
+    def _append_backlog(self, frame: bytes, queued_at: float) -> list:
+        """记录本次说话的录音帧，丢弃超过最大时长的旧帧"""
+        entry = [next(self._uplink_index), queued_at, frame, False]
+        self.uplink_backlog.append(entry)
+        while queued_at - self.uplink_backlog[0][1] > self.uplink_replay_max_age:
+            if not self.uplink_backlog.popleft()[3]:
+                self.uplink_dropped["expired"] += 1
+        return entry
+
+    def reset_uplink(self):
+        """开始新的一次说话（或取消本次说话），丢弃还没发送的录音"""
+        self.uplink_backlog.clear()
+        while self.uplink_queue and not self.uplink_queue.empty():
+            self.uplink_queue.get_nowait()
+
+    async def resume_uplink(self, replay: bool):
+        """
+        重连后恢复上行发送
+
+        replay 为 True 时（说话过程中断线），先把本次说话的录音（包括断线前已经发送过的）
+        按顺序补发给新的会话，再继续实时发送；否则丢弃断线期间缓存的录音
+        """
+        if not replay:
+            self.uplink_dropped["closed"] += sum(
+                1 for entry in self.uplink_backlog if not entry[3]
+            )
+            self.uplink_backlog.clear()
+            self.uplink_hold = False
+            return
+
+        cursor = 0
+        while True:
+            # 补发期间新录制的帧也会加入 uplink_backlog，直到全部发完才恢复实时发送
+            pending = [entry for entry in self.uplink_backlog if entry[0] >= cursor]
+            if not pending:
+                break
+            now = time.perf_counter()
+            for entry in pending:
+                cursor = entry[0] + 1
+                if now - entry[1] > self.uplink_replay_max_age:
+                    if not entry[3]:
+                        self.uplink_dropped["expired"] += 1
+                    continue
+                try:
+                    await self.send_audio_frame(entry[2])
+                except Exception:
+                    return
+                entry[3] = True
+                self.uplink_replayed += 1
+        self.uplink_hold = False
+
+    async def send_audio_frame(self, frame: bytes):
+        """发送一帧音频数据的抽象方法，需要在子类中实现"""
+        raise NotImplementedError("send_audio_frame方法必须由子类实现")
+
+    def get_write_buffer_size(self) -> int:
+        """底层连接发送缓冲区中积压的字节数"""
+        return 0
+
+    def is_audio_channel_opened(self) -> bool:
+        """检查音频通道是否打开的抽象方法，需要在子类中实现"""
+        raise NotImplementedError("is_audio_channel_opened方法必须由子类实现")
+
+    async def validate(self) -> bool:
+        """验证连接是否仍然可用（子类可以发送心跳确认）"""
+        return self.is_audio_channel_opened()
+
+    def get_uplink_metrics(self) -> dict:
+        return {
+            "depth": self.uplink_queue.qsize() if self.uplink_queue else 0,
+            "max_depth": self.uplink_max_depth,
+            "write_buffer": self.get_write_buffer_size(),
+            "latency": self.uplink_latency.to_dict(),
+            "dropped": dict(self.uplink_dropped),
+            "held": sum(1 for entry in self.uplink_backlog if not entry[3]),
+            "replayed": self.uplink_replayed,
+        }
+
     async def send_text(self, message):
         """发送文本消息的抽象方法，需要在子类中实现"""
         raise NotImplementedError("send_text方法必须由子类实现")
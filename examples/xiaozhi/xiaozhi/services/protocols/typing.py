@@ -1,3 +1,6 @@
+from config import APP_CONFIG
+
+
 class ListeningMode:
     """监听模式"""
     ALWAYS_ON = "always_on"
@@ -9,6 +12,12 @@ class AbortReason:
     ABORT = "abort"
     WAKE_WORD_DETECTED = "wake_word_detected"
 
+class TaskKind:
+    """调度任务类型"""
+    ABORT = "abort"  # 中止语音输出（最高优先级）
+    STATE = "state"  # 状态切换
+    UI = "ui"  # 界面更新（可合并、可丢弃）
+
 class DeviceState:
     """设备状态"""
     IDLE = "idle"
@@ -16,15 +25,12 @@ class DeviceState:
     LISTENING = "listening"
     SPEAKING = "speaking"
 
-class EventType:
-    """事件类型"""
-    SCHEDULE_EVENT = "schedule_event"
-    AUDIO_INPUT_READY_EVENT = "audio_input_ready_event"
-
 class AudioConfig:
     """音频配置"""
-    FORMAT = 8
+    FORMAT = 8  # paInt16
+    FLOAT_FORMAT = 1  # paFloat32，归一化到 [-1, 1)
     SAMPLE_RATE = 16000
     CHANNELS = 1
-    FRAME_DURATION = 60  # ms
+    FRAME_DURATION = APP_CONFIG.get("opus", {}).get("frame_duration", 60)  # ms
     FRAME_SIZE = int(SAMPLE_RATE * (FRAME_DURATION / 1000))
+    OUTPUT_SAMPLE_RATE = APP_CONFIG.get("playback", {}).get("sample_rate", 24000)
@@ -3,9 +3,7 @@ import json
 
 import websockets
 
-from xiaozhi.ref import get_xiaozhi
 from xiaozhi.services.protocols.protocol import Protocol
-from xiaozhi.services.protocols.typing import DeviceState
 from xiaozhi.utils.config import ConfigManager
 
 
@@ -15,11 +13,6 @@ class WebsocketProtocol(Protocol):
         # 获取配置管理器实例
         self.config = ConfigManager.instance()
         self.websocket = None
-        self.server_sample_rate = 24000
-        self.server_frame_duration = 60
-        self.server_frame_size = int(
-            self.server_sample_rate * (self.server_frame_duration / 1000)
-        )
         self.connected = False
         self.hello_received = None  # 初始化时先设为 None
         self.WEBSOCKET_URL = self.config.get_config("NETWORK.WEBSOCKET_URL")
@@ -38,6 +31,14 @@ class WebsocketProtocol(Protocol):
             except Exception:
                 pass
 
+    def _abort_websocket(self):
+        """直接断开已经失效的连接（不等待关闭握手，对端可能已经没有响应）"""
+        transport = getattr(self.websocket, "transport", None)
+        if transport:
+            transport.abort()
+        self.websocket = None
+        self.connected = False
+
     async def connect(self) -> bool:
         """连接到WebSocket服务器"""
         try:
@@ -63,17 +64,7 @@ class WebsocketProtocol(Protocol):
             asyncio.create_task(self._message_handler())
 
             # 发送客户端hello消息
-            hello_message = {
-                "type": "hello",
-                "version": 1,
-                "transport": "websocket",
-                "audio_params": {
-                    "format": "opus",
-                    "sample_rate": 16000,
-                    "channels": 1,
-                    "frame_duration": 60,
-                },
-            }
+            hello_message = self.get_hello_message("websocket")
             await self.send_text(json.dumps(hello_message))
 
             # 等待服务器hello响应
@@ -112,16 +103,13 @@ class WebsocketProtocol(Protocol):
             if self.on_audio_channel_closed:
                 await self.on_audio_channel_closed()
 
-    async def send_audio(self, frames: list[bytes]):
-        """发送音频数据"""
-        if not self.is_audio_channel_opened():  # 使用已有的 is_connected 方法
-            return
+    async def send_audio_frame(self, frame: bytes):
+        """发送一帧音频数据"""
+        await self.websocket.send(frame)
 
-        try:
-            for frame in frames:
-                await self.websocket.send(frame)
-        except Exception:
-            pass
+    def get_write_buffer_size(self) -> int:
+        transport = getattr(self.websocket, "transport", None)
+        return transport.get_write_buffer_size() if transport else 0
 
     async def send_text(self, message: str):
         """发送文本消息"""
@@ -134,12 +122,7 @@ class WebsocketProtocol(Protocol):
         """检查音频通道是否打开"""
         return self.websocket is not None and self.connected
 
-    _is_heartbeat_running = False
-
     async def open_audio_channel(self):
-        if not self._is_heartbeat_running:
-            self._is_heartbeat_running = True
-            asyncio.create_task(self.heartbeat())
         await self.connect()
 
     async def _handle_server_hello(self, data: dict):
@@ -156,22 +139,10 @@ class WebsocketProtocol(Protocol):
             if not transport or transport != "websocket":
                 return
 
-            # TODO 使用默认的 24k 采样率
-            # xiaozhi-esp32-server 返回的参数是 16k 采样率，但实际用的是 24k 采样率
-
             # 获取音频参数
-            # audio_params = data.get("audio_params")
-            # if audio_params:
-            #     # 获取服务器的采样率
-            #     sample_rate = audio_params.get("sample_rate")
-            #     if sample_rate:
-            #         self.server_sample_rate = sample_rate
-            #     frame_duration = audio_params.get("frame_duration")
-            #     if frame_duration:
-            #         self.server_frame_duration = frame_duration
-            #     self.server_frame_size = int(
-            #         self.server_sample_rate * (self.server_frame_duration / 1000)
-            #     )
+            # 下行音频会直接解码成音箱的采样率，所以即使服务端返回的采样率和实际编码用的不一致
+            # （比如 xiaozhi-esp32-server 返回 16k，实际用的是 24k）也不影响播放
+            self.update_audio_params(data.get("audio_params"))
 
             # 设置 hello 接收事件
             self.hello_received.set()
@@ -196,14 +167,13 @@ class WebsocketProtocol(Protocol):
             except Exception:
                 pass
 
-    async def heartbeat(self):
-        while True:
-            if self.websocket and get_xiaozhi().device_state == DeviceState.IDLE:
-                try:
-                    await self.send_text(
-                        json.dumps({"session_id": "", "type": "ping"})
-                    )
-                except Exception:
-                    # 发送心跳失败，重新连接
-                    await self.open_audio_channel()
-            await asyncio.sleep(1)
+    async def validate(self) -> bool:
+        """发送心跳并等待 pong，确认连接仍然可用"""
+        try:
+            await self.send_text(json.dumps({"session_id": "", "type": "ping"}))
+            pong_waiter = await self.websocket.ping()
+            await asyncio.wait_for(pong_waiter, timeout=1.0)
+            return True
+        except Exception:
+            self._abort_websocket()
+            return False
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import random
@@ -7,6 +8,16 @@ def get_env(key: str, default_value: str | None = None):
     return os.environ.get(key, default_value)
 
 
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """创建事件循环（安装了 uvloop 时优先使用 uvloop）"""
+    try:
+        import uvloop
+
+        return uvloop.new_event_loop()
+    except ImportError:
+        return asyncio.new_event_loop()
+
+
 def to_set(data):
     if isinstance(data, list):
         return list(set(data))
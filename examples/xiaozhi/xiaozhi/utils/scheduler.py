@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import threading
+from typing import Callable, Hashable
+
+from xiaozhi.services.protocols.typing import TaskKind
+
+# 按优先级从高到低处理
+PRIORITIES = [TaskKind.ABORT, TaskKind.STATE, TaskKind.UI]
+
+
+class TaskScheduler:
+    """
+    任务调度器
+
+    把其他线程提交的任务放到事件循环上执行：
+    - 中止任务优先于状态切换，状态切换优先于界面更新
+    - 相同合并键的任务只保留一个（保留原来的位置，执行最新的回调）
+    - 队列有上限，满了以后先丢弃最旧的低优先级任务
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int = 64):
+        self.loop = loop
+        self.max_size = max_size
+        # 每种任务一个有序字典：合并键 -> 回调
+        self.queues: dict[str, dict[Hashable, Callable]] = {
+            kind: {} for kind in PRIORITIES
+        }
+        self.size = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup_pending = False
+
+        # 统计
+        self.max_depth = 0
+        self.coalesced = 0
+        self.dropped = {kind: 0 for kind in PRIORITIES}
+
+    def schedule(
+        self,
+        callback: Callable,
+        kind: str = TaskKind.STATE,
+        key: Hashable = None,
+    ):
+        """
+        提交任务
+
+        参数:
+            callback: 在事件循环上执行的回调
+            kind: 任务类型，决定优先级
+            key: 合并键，为空时不合并
+        """
+        with self._lock:
+            queue = self.queues[kind]
+            if key is None:
+                key = next(self._seq)
+            elif key in queue:
+                queue[key] = callback
+                self.coalesced += 1
+                return
+
+            if self.size >= self.max_size and not self._evict(kind):
+                self.dropped[kind] += 1
+                return
+
+            queue[key] = callback
+            self.size += 1
+            self.max_depth = max(self.max_depth, self.size)
+
+            # 事件循环已经被唤醒过了
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        self.loop.call_soon_threadsafe(self._run)
+
+    def _evict(self, kind: str) -> bool:
+        """队列已满时，丢弃一个优先级不高于 kind 的最旧任务"""
+        for victim in reversed(PRIORITIES):
+            queue = self.queues[victim]
+            if queue:
+                queue.pop(next(iter(queue)))
+                self.size -= 1
+                self.dropped[victim] += 1
+                return True
+            if victim == kind:
+                break
+        return False
+
+    def _pop(self):
+        for kind in PRIORITIES:
+            queue = self.queues[kind]
+            if queue:
+                self.size -= 1
+                return queue.pop(next(iter(queue)))
+        return None
+
+    def _run(self):
+        """按优先级执行所有待处理的任务（在事件循环上运行）"""
+        while True:
+            with self._lock:
+                task = self._pop()
+                if task is None:
+                    self._wakeup_pending = False
+                    return
+            try:
+                task()
+            except Exception:
+                pass
+
+    def get_metrics(self) -> dict:
+        return {
+            "depth": self.size,
+            "max_depth": self.max_depth,
+            "coalesced": self.coalesced,
+            "dropped": dict(self.dropped),
+        }
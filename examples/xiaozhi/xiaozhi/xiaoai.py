@@ -1,6 +1,6 @@
 import argparse
 import asyncio
-import threading
+import time
 
 import numpy as np
 import open_xiaoai_server
@@ -8,6 +8,8 @@ import open_xiaoai_server
 from xiaozhi.event import EventManager
 from xiaozhi.ref import get_speaker, set_xiaoai
 from xiaozhi.services.audio.stream import GlobalStream
+from xiaozhi.services.audio.worker import StageStats
+from xiaozhi.services.protocols.typing import AudioConfig
 from xiaozhi.services.speaker import SpeakerManager
 from xiaozhi.utils.base import json_decode
 
@@ -24,8 +26,15 @@ v1.0.0  by: https://del.wang
 class XiaoAI:
     mode = "xiaoai"
     speaker = SpeakerManager()
+    # 与小智共用同一个事件循环
     async_loop: asyncio.AbstractEventLoop = None
 
+    # 事件分发延迟统计（从 Rust 回调到协程开始执行）
+    dispatch = StageStats()
+
+    # 还没交给 Rust 发送的下行音频
+    pending_outputs = set()
+
     @classmethod
     def setup_mode(cls):
         set_xiaoai(cls)
@@ -49,14 +58,43 @@ class XiaoAI:
         GlobalStream.input(audio_array.tobytes())
 
     @classmethod
-    def on_output_data(cls, data: bytes):
+    def on_output_data(cls, data: bytes, generation: int | None = None):
+        # 没有指定代数（如 SpeakerManager.play 直接播放音频流）时按当前代数播放
+        if generation is None:
+            generation = GlobalStream.output_generation
+
         async def on_output_data_async(data: bytes):
+            # 打断之后才轮到的旧音频直接丢弃
+            if generation != GlobalStream.output_generation:
+                return
             return await open_xiaoai_server.on_output_data(data)
 
-        asyncio.run_coroutine_threadsafe(
-            on_output_data_async(data),
-            cls.async_loop,
-        )
+        future = cls.run_async(on_output_data_async(data))
+        cls.pending_outputs.add(future)
+        future.add_done_callback(cls.pending_outputs.discard)
+
+    @classmethod
+    def on_flush_output(cls):
+        """取消排队中的下行音频，并让音箱丢弃已经缓冲的音频"""
+        for future in list(cls.pending_outputs):
+            future.cancel()
+        return cls.run_async(open_xiaoai_server.flush_output())
+
+    @classmethod
+    def run_async(cls, coro):
+        """在事件循环上运行协程（已经在事件循环线程中时不再跨线程调度）"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is cls.async_loop:
+            return cls.async_loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, cls.async_loop)
+
+    @classmethod
+    def get_metrics(cls) -> dict:
+        """事件分发延迟（ms）"""
+        return {"dispatch": cls.dispatch.to_dict()}
 
     @classmethod
     async def run_shell(cls, script: str, timeout: float = 10 * 1000):
@@ -88,28 +126,25 @@ class XiaoAI:
         elif event_type == "playing":
             get_speaker().status = event_data.lower()
 
-    @classmethod
-    def __init_background_event_loop(cls):
-        def run_event_loop():
-            cls.async_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(cls.async_loop)
-            cls.async_loop.run_forever()
-
-        thread = threading.Thread(target=run_event_loop, daemon=True)
-        thread.start()
-
     @classmethod
     def __on_event(cls, event: str):
         asyncio.run_coroutine_threadsafe(
-            cls.on_event(event),
+            cls.__dispatch_event(event, time.perf_counter()),
             cls.async_loop,
         )
 
+    @classmethod
+    async def __dispatch_event(cls, event: str, sent_at: float):
+        cls.dispatch.add(time.perf_counter() - sent_at)
+        await cls.on_event(event)
+
     @classmethod
     async def init_xiaoai(cls):
+        cls.async_loop = asyncio.get_running_loop()
         GlobalStream.on_output_data = cls.on_output_data
+        GlobalStream.on_flush_output = cls.on_flush_output
+        open_xiaoai_server.set_output_sample_rate(AudioConfig.OUTPUT_SAMPLE_RATE)
         open_xiaoai_server.register_fn("on_input_data", cls.on_input_data)
         open_xiaoai_server.register_fn("on_event", cls.__on_event)
-        cls.__init_background_event_loop()
         print(ASCII_BANNER)
         await open_xiaoai_server.start_server()
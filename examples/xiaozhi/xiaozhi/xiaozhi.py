@@ -7,16 +7,19 @@ import time
 from xiaozhi.event import EventManager
 from xiaozhi.ref import set_xiaozhi
 from xiaozhi.services.audio.kws import KWS
+from xiaozhi.services.audio.stream import GlobalStream, MyStream
 from xiaozhi.services.audio.vad import VAD
+from xiaozhi.services.protocols.connection import ConnectionManager
 from xiaozhi.services.protocols.typing import (
     AbortReason,
     DeviceState,
-    EventType,
     ListeningMode,
+    TaskKind,
 )
 from xiaozhi.services.protocols.websocket_protocol import WebsocketProtocol
-from xiaozhi.utils.base import get_env
+from xiaozhi.utils.base import get_env, new_event_loop
 from xiaozhi.utils.config import ConfigManager
+from xiaozhi.utils.scheduler import TaskScheduler
 from xiaozhi.xiaoai import XiaoAI
 
 
@@ -51,33 +54,34 @@ class XiaoZhi:
         # 音频处理相关
         self.audio_codec = None
 
-        # 事件循环和线程
-        self.loop = asyncio.new_event_loop()
+        # 事件循环和线程（协议、小爱事件、EventManager 共用同一个事件循环）
+        self.loop = new_event_loop()
         self.loop_thread = None
         self.running = False
 
-        # 任务队列和锁
-        self.main_tasks = []
-        self.mutex = threading.Lock()
+        # 任务调度器
+        self.scheduler = TaskScheduler(self.loop)
 
         # 协议实例
         self.protocol = None
+        self.connection = None
 
         # 回调函数
         self.on_state_changed_callbacks = []
 
-        # 初始化事件对象
-        self.events = {
-            EventType.SCHEDULE_EVENT: threading.Event(),
-            EventType.AUDIO_INPUT_READY_EVENT: threading.Event(),
-        }
+        # 有新的录音数据需要上传（由采集总线唤醒）
+        self.audio_input_ready = asyncio.Event()
 
         # 创建显示界面
         self.display = None
         set_xiaozhi(self)
 
     def run(self):
-        self.protocol = WebsocketProtocol()
+        self.running = True
+        self.protocol = self._create_protocol()
+        self.connection = ConnectionManager(self.protocol)
+
+        XiaoAI.async_loop = self.loop
 
         # 创建并启动事件循环线程
         self.loop_thread = threading.Thread(target=self._run_event_loop)
@@ -91,11 +95,6 @@ class XiaoZhi:
         asyncio.run_coroutine_threadsafe(XiaoAI.init_xiaoai(), self.loop)
         asyncio.run_coroutine_threadsafe(self._initialize_xiaozhi(), self.loop)
 
-        # 启动主循环线程
-        main_loop_thread = threading.Thread(target=self._main_loop)
-        main_loop_thread.daemon = True
-        main_loop_thread.start()
-
         VAD.start()
         KWS.start()
 
@@ -103,6 +102,14 @@ class XiaoZhi:
         self._initialize_display()
         self.display.start()
 
+    def _create_protocol(self):
+        """按配置创建通信协议"""
+        if self.config.get_config("NETWORK.PROTOCOL") == "mqtt":
+            from xiaozhi.services.protocols.mqtt_protocol import MqttProtocol
+
+            return MqttProtocol()
+        return WebsocketProtocol()
+
     def _run_event_loop(self):
         """运行事件循环的线程函数"""
         asyncio.set_event_loop(self.loop)
@@ -114,16 +121,15 @@ class XiaoZhi:
         # 初始化音频编解码器
         self._initialize_audio()
 
-        # 设置协议回调
-        self.protocol.on_network_error = self._on_network_error
+        # 设置协议回调（连接失败由连接管理处理）
         self.protocol.on_incoming_audio = self._on_incoming_audio
         self.protocol.on_incoming_json = self._on_incoming_json
         self.protocol.on_audio_channel_opened = self._on_audio_channel_opened
         self.protocol.on_audio_channel_closed = self._on_audio_channel_closed
 
-        # 打开音频通道
+        # 打开音频通道（由连接管理在后台保持连接）
         self.device_state = DeviceState.CONNECTING
-        await self.protocol.open_audio_channel()
+        await self.connection.start()
 
     def _initialize_audio(self):
         """初始化音频设备和编解码器"""
@@ -134,7 +140,9 @@ class XiaoZhi:
         except Exception as e:
             self.alert("错误", f"初始化音频设备失败: {e}")
 
-        threading.Thread(target=self._audio_input_event_trigger, daemon=True).start()
+        # 录音数据由采集总线通知，在事件循环上读取、编码并发送
+        GlobalStream.input_listeners.append(self._on_audio_input)
+        self.loop.create_task(self._audio_input_loop())
 
     def _initialize_display(self):
         """初始化显示界面"""
@@ -156,76 +164,55 @@ class XiaoZhi:
             emotion_callback=self._get_current_emotion,
             mode_callback=self._on_mode_changed,
             auto_callback=self.toggle_chat_state,
-            abort_callback=lambda: self.abort_speaking(AbortReason.WAKE_WORD_DETECTED),
+            abort_callback=lambda: self.schedule(
+                lambda: self.abort_speaking(AbortReason.WAKE_WORD_DETECTED),
+                TaskKind.ABORT,
+                "abort_speaking",
+            ),
         )
 
-    def _main_loop(self):
-        """应用程序主循环"""
-        self.running = True
-
-        while self.running:
-            # 等待事件
-            for event_type, event in self.events.items():
-                if event.is_set():
-                    event.clear()
+    def schedule(self, callback, kind=TaskKind.STATE, key=None):
+        """调度任务到事件循环（相同合并键的任务只执行最新的一个）"""
+        self.scheduler.schedule(callback, kind, key)
 
-                    if event_type == EventType.AUDIO_INPUT_READY_EVENT:
-                        self._handle_input_audio()
-                    elif event_type == EventType.SCHEDULE_EVENT:
-                        self._process_scheduled_tasks()
+    def _on_audio_input(self):
+        """采集总线写入了新数据（在音频线程中调用）"""
+        if self.device_state == DeviceState.LISTENING:
+            self.loop.call_soon_threadsafe(self.audio_input_ready.set)
 
-            time.sleep(0.01)
-
-    def _process_scheduled_tasks(self):
-        """处理调度任务"""
-        with self.mutex:
-            tasks = self.main_tasks.copy()
-            self.main_tasks.clear()
-
-        for task in tasks:
-            try:
-                task()
-            except Exception:
-                pass
+    async def _audio_input_loop(self):
+        """音频输入：录音数据就绪后交给编解码线程读取并编码，不等待编码结果"""
+        while self.running:
+            await self.audio_input_ready.wait()
+            self.audio_input_ready.clear()
 
-    def schedule(self, callback):
-        """调度任务到主循环"""
-        with self.mutex:
-            # 如果是中止语音的任务，检查是否已经存在相同类型的任务
-            if "abort_speaking" in str(callback):
-                # 如果已经有中止任务在队列中，就不再添加
-                if any("abort_speaking" in str(task) for task in self.main_tasks):
-                    return
-            self.main_tasks.append(callback)
-        self.events[EventType.SCHEDULE_EVENT].set()
-
-    def _handle_input_audio(self):
-        """处理音频输入"""
-        if self.device_state != DeviceState.LISTENING:
-            return
+            if self.device_state != DeviceState.LISTENING:
+                continue
 
-        encoded_data = self.audio_codec.read_audio()
-        if encoded_data and self.protocol and self.protocol.is_audio_channel_opened():
+            # 任务队列已满时跳过这一次，数据还留在采集总线里，下次读取时一起编码
+            future = self.audio_codec.worker.submit(
+                "uplink", self.audio_codec.read_audio
+            )
+            if future is not None:
+                future.add_done_callback(self._on_audio_encoded)
+
+    def _on_audio_encoded(self, future):
+        """录音编码完成（在编解码线程中调用）"""
+        if not isinstance(self.audio_codec.input_stream, MyStream):
+            # 本地 PyAudio 的 read 是阻塞的，读完一帧就接着读
+            self.loop.call_soon_threadsafe(self.audio_input_ready.set)
+
+        # 断线时也交给协议，由协议缓存起来等重连后补发
+        encoded_data = None if future.exception() else future.result()
+        if encoded_data and self.protocol:
             asyncio.run_coroutine_threadsafe(
                 self.protocol.send_audio(encoded_data), self.loop
             )
 
-    def _on_network_error(self, message):
-        """网络错误回调"""
-        self.set_device_state(DeviceState.IDLE)
-        if self.device_state != DeviceState.CONNECTING:
-            self.set_device_state(DeviceState.IDLE)
-
-            # 关闭现有连接
-            if self.protocol:
-                asyncio.run_coroutine_threadsafe(
-                    self.protocol.close_audio_channel(), self.loop
-                )
-
-    def _on_incoming_audio(self, data):
-        """接收音频数据回调"""
+    def _on_incoming_audio(self, data, seq=None):
+        """接收音频数据回调（UDP 传输时带有序号）"""
         if self.device_state == DeviceState.SPEAKING:
-            self.audio_codec.write_audio(data)
+            self.audio_codec.write_audio(data, seq)
 
     def _on_incoming_json(self, json_data):
         """接收JSON数据回调"""
@@ -255,10 +242,10 @@ class XiaoZhi:
         state = data.get("state", "")
         if state == "start":
             EventManager.on_tts_start(data.get("session_id"))
-            self.schedule(lambda: self._handle_tts_start())
+            self.schedule(self._handle_tts_start)
         elif state == "stop":
             EventManager.on_tts_end(data.get("session_id"))
-            self.schedule(lambda: self._handle_tts_stop())
+            self.schedule(self._handle_tts_stop)
         elif state == "sentence_start":
             text = data.get("text", "")
             if text:
@@ -272,7 +259,11 @@ class XiaoZhi:
                         "VERIFICATION_CODE", verification_code.group(1)
                     )
 
-                self.schedule(lambda: self.set_chat_message("assistant", text))
+                self.schedule(
+                    lambda: self.set_chat_message("assistant", text),
+                    TaskKind.UI,
+                    "chat_message:assistant",
+                )
 
     def _handle_tts_start(self):
         """处理TTS开始事件"""
@@ -284,34 +275,47 @@ class XiaoZhi:
 
     def _handle_tts_stop(self):
         """处理TTS停止事件"""
-        pass
+        # 服务端已经发完，抖动缓冲里剩下的音频直接播完，不再等待凑够目标深度
+        self.audio_codec.jitter_buffer.end()
 
     def _handle_stt_message(self, data):
         """处理STT消息"""
         text = data.get("text", "")
         if text:
             print(f"💬 我说：{text}")
-            self.schedule(lambda: self.set_chat_message("user", text))
+            self.schedule(
+                lambda: self.set_chat_message("user", text),
+                TaskKind.UI,
+                "chat_message:user",
+            )
 
     def _handle_llm_message(self, data):
         """处理LLM消息"""
         emotion = data.get("emotion", "")
         if emotion:
-            self.schedule(lambda: self.set_emotion(emotion))
+            self.schedule(lambda: self.set_emotion(emotion), TaskKind.UI, "emotion")
 
     async def _on_audio_channel_opened(self):
         """音频通道打开回调"""
+        self.audio_codec.set_output_frame_duration(self.protocol.server_frame_duration)
+        self.audio_codec.jitter_buffer.reset()  # 新的会话，序号重新开始
+        if self.device_state == DeviceState.LISTENING:
+            # 说话过程中重连：重新开始监听，并补发本次说话的录音
+            self.loop.create_task(self._resume_listening())
+            return
         self.set_device_state(DeviceState.IDLE)
+        await self.protocol.resume_uplink(replay=False)
 
-    def _audio_input_event_trigger(self):
-        """音频输入事件触发器"""
-        while self.running:
-            if self.audio_codec.input_stream.is_active():
-                self.events[EventType.AUDIO_INPUT_READY_EVENT].set()
-            time.sleep(0.01)
+    async def _resume_listening(self):
+        await self.protocol.send_start_listening(ListeningMode.MANUAL)
+        await self.protocol.resume_uplink(replay=True)
 
     async def _on_audio_channel_closed(self):
         """音频通道关闭回调"""
+        if self.device_state == DeviceState.LISTENING:
+            # 说话过程中断线：继续录音，马上重连
+            self.connection.warm_up()
+            return
         self.set_device_state(DeviceState.IDLE)
         self.audio_codec.stop_streams()
 
@@ -336,6 +340,7 @@ class XiaoZhi:
             # 打开输入流
             if not self.audio_codec.input_stream.is_active():
                 self.audio_codec.input_stream.start_stream()
+            self.loop.call_soon_threadsafe(self.audio_input_ready.set)
         elif state == DeviceState.SPEAKING:
             self.display.update_status("说话中...")
             # 停止输入流
@@ -416,32 +421,32 @@ class XiaoZhi:
         if not self.protocol:
             return
 
+        if self.device_state == DeviceState.SPEAKING:
+            self.audio_codec.flush_output()
         self.set_device_state(DeviceState.IDLE)
-        asyncio.run_coroutine_threadsafe(
-            self.protocol.send_abort_speaking(AbortReason.ABORT),
-            self.loop,
-        )
-        asyncio.run_coroutine_threadsafe(
-            self.protocol.send_start_listening(ListeningMode.MANUAL), self.loop
-        )
+        self.protocol.reset_uplink()
+        self.loop.create_task(self._send_start_listening())
         self.set_device_state(DeviceState.LISTENING)
 
+    async def _send_start_listening(self):
+        await self.protocol.send_abort_speaking(AbortReason.ABORT)
+        await self.protocol.send_start_listening(ListeningMode.MANUAL)
+
     def stop_listening(self):
         """停止监听"""
         self.schedule(self._stop_listening_impl)
 
     def _stop_listening_impl(self):
         """停止监听的实现"""
-        asyncio.run_coroutine_threadsafe(self.protocol.send_stop_listening(), self.loop)
+        self.loop.create_task(self.protocol.send_stop_listening())
         self.set_device_state(DeviceState.IDLE)
 
     def abort_speaking(self, reason):
         """中止语音输出"""
+        self.audio_codec.flush_output()
         self.set_device_state(DeviceState.IDLE)
-        asyncio.run_coroutine_threadsafe(
-            self.protocol.send_abort_speaking(AbortReason.ABORT),
-            self.loop,
-        )
+        # 通常由调度器在事件循环上调用，这时直接创建任务，不再跨线程调度
+        XiaoAI.run_async(self.protocol.send_abort_speaking(AbortReason.ABORT))
 
     def alert(self, title, message):
         """显示警告信息"""